@@ -2,10 +2,12 @@ from flask import Flask, render_template, request, jsonify
 from flask_cors import CORS
 from config import Config
 from backend.api.routes import api_bp
+from backend.api.responses import init_app
 import os
 
 app = Flask(__name__)
 CORS(app)
+init_app(app)  # Fast JSON, compression and ETags
 
 # Register blueprints
 app.register_blueprint(api_bp, url_prefix='/api')
@@ -0,0 +1,50 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from backend.analyzers.seo_analyzer import SEOAnalyzer
+from config import Config
+
+
+def analyze_one(url, include_performance=False, include_geo=False, check_links=False, page=None):
+    """Analyze a single URL (or a pre-fetched page) for a batch, never raising"""
+    try:
+        result = SEOAnalyzer(url, page=page).analyze(
+            include_performance=include_performance,
+            include_geo=include_geo,
+            check_links=check_links
+        )
+    except Exception as e:
+        result = {'success': False, 'error': str(e)}
+    result.setdefault('url', url)
+    return result
+
+
+def iter_analyses(urls, max_workers=None, **options):
+    """
+    Analyze URLs on a bounded worker pool, yielding each result as it finishes
+    URLs are pulled from the iterable lazily and only a fixed number of
+    analyses are in flight, so memory stays flat however long the input is
+    and a slow consumer holds back new work
+    """
+    max_workers = max_workers or Config.BATCH_MAX_WORKERS
+    max_in_flight = max_workers * 2
+    url_iter = iter(urls)
+    pending = set()
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='batch')
+    try:
+        while True:
+            for url in url_iter:
+                url = url.strip()
+                if url:
+                    pending.add(executor.submit(analyze_one, url, **options))
+                if len(pending) >= max_in_flight:
+                    break
+
+            if not pending:
+                return
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        # Runs on normal completion and when the consumer goes away
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -1,12 +1,17 @@
 import re
-from backend.utils.helpers import extract_keywords
+from backend.utils.keywords import analyze_keywords
+from backend.utils.dom_index import build_document_index
+from backend.utils.duplicates import simhash
+from backend.utils.readability import readability_metrics
 
 class ContentAnalyzer:
     """Analyze content quality for SEO"""
     
-    def __init__(self, soup, url):
+    def __init__(self, soup, url, index=None):
         self.soup = soup
         self.url = url
+        self.index = index or build_document_index(soup)
+        self.readability = None
         self.issues = []
         self.recommendations = []
     
@@ -17,9 +22,11 @@ class ContentAnalyzer:
         
         # Analyze content
         word_count = self.count_words(text_content)
-        keywords = extract_keywords(text_content, top_n=15)
+        extracted = analyze_keywords(text_content, top_n=15, top_phrases=10, language=self.index.language)
+        keywords = extracted['keywords']
         readability_score = self.calculate_readability(text_content, word_count)
         keyword_density = self.calculate_keyword_density(keywords, word_count)
+        fingerprint = simhash(text_content)
         
         # Calculate overall content score
         content_score = self.calculate_content_score(word_count, readability_score, keywords)
@@ -29,22 +36,25 @@ class ContentAnalyzer:
             'word_count': word_count,
             'character_count': len(text_content),
             'keywords': [{'keyword': k[0], 'frequency': k[1]} for k in keywords],
+            'phrases': [{'phrase': p[0], 'frequency': p[1]} for p in extracted['phrases']],
             'top_keyword': keywords[0][0] if keywords else None,
+            'language': extracted['language'],
             'keyword_density': keyword_density,
             'readability_score': readability_score,
-            'paragraph_count': len(self.soup.find_all('p')),
+            'readability': self.readability,
+            'paragraph_count': self.index.count('p'),
+            'simhash': f'{fingerprint:016x}' if fingerprint is not None else None,
             'issues': self.issues,
             'recommendations': self.recommendations
         }
     
     def get_text_content(self):
-        """Extract visible text content from page"""
-        # Remove script and style elements
-        for script in self.soup(['script', 'style', 'nav', 'footer', 'header']):
-            script.decompose()
-        
-        # Get text
-        text = self.soup.get_text(separator=' ', strip=True)
+        """
+        Extract visible text content from page
+        Script, style, nav, footer and header subtrees are skipped while
+        indexing, so the shared parse tree is left untouched
+        """
+        text = self.index.visible_text
         
         # Clean up whitespace
         text = re.sub(r'\s+', ' ', text)
@@ -57,26 +67,20 @@ class ContentAnalyzer:
         return len(words)
     
     def calculate_readability(self, text, word_count):
-        """Calculate simple readability score"""
+        """
+        Map Flesch Reading Ease to a 0-10 score
+        60 and above (plain English, about 8th-9th grade) scores 10; harder
+        text loses a point for every 6 points below that
+        """
         if word_count == 0:
             return 0
         
-        # Simple readability based on average word length and sentence length
-        sentences = re.split(r'[.!?]+', text)
-        sentence_count = len([s for s in sentences if s.strip()])
-        
-        if sentence_count == 0:
+        self.readability = readability_metrics(text)
+        if self.readability is None:
             return 5
         
-        avg_words_per_sentence = word_count / sentence_count
-        
-        # Score based on sentence length (15-20 words per sentence is ideal)
-        if 12 <= avg_words_per_sentence <= 22:
-            readability = 10
-        elif 8 <= avg_words_per_sentence <= 28:
-            readability = 7
-        else:
-            readability = 5
+        reading_ease = self.readability['flesch_reading_ease']
+        readability = min(max(reading_ease, 0) / 6, 10)
         
         return round(readability, 1)
     
@@ -109,7 +113,14 @@ class ContentAnalyzer:
         # Readability scoring
         if readability_score < 7:
             score -= 1
-            self.issues.append('Content readability could be improved')
+            if self.readability:
+                self.issues.append(
+                    f"Content readability could be improved "
+                    f"(Flesch Reading Ease {self.readability['flesch_reading_ease']}, "
+                    f"grade {self.readability['flesch_kincaid_grade']})"
+                )
+            else:
+                self.issues.append('Content readability could be improved')
             self.recommendations.append('Use shorter sentences and simpler words for better readability')
         
         # Keyword scoring
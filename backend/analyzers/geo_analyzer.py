@@ -1,14 +1,33 @@
-import re
+from backend.utils.dom_index import build_document_index
+from backend.utils.geo_signals import LOCAL_KEYWORDS, scan_geo_signals
+from backend.utils.structured_data import extract_structured_data
 
 class GeoAnalyzer:
     """Analyze local/GEO SEO factors"""
     
-    def __init__(self, soup, url):
+    def __init__(self, soup, url, index=None):
         self.soup = soup
         self.url = url
+        self.index = index or build_document_index(soup)
+        self._signals = None
+        self._structured_data = None
         self.issues = []
         self.recommendations = []
     
+    @property
+    def signals(self):
+        """Geo signals of the page text, scanned once and shared by every check"""
+        if self._signals is None:
+            self._signals = scan_geo_signals(self.index.text)
+        return self._signals
+    
+    @property
+    def structured_data(self):
+        """JSON-LD, microdata and RDFa entities of the page, extracted once"""
+        if self._structured_data is None:
+            self._structured_data = extract_structured_data(self.index)
+        return self._structured_data
+    
     def analyze(self, location=None):
         """Run all GEO/Local SEO analyses"""
         nap_score = self.analyze_nap()
@@ -29,20 +48,11 @@ class GeoAnalyzer:
     
     def analyze_nap(self):
         """Analyze NAP (Name, Address, Phone) consistency"""
-        text = self.soup.get_text()
-        
-        # Check for phone number
-        phone_pattern = r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b|\(\d{3}\)\s*\d{3}[-.]?\d{4}'
-        phones = re.findall(phone_pattern, text)
-        
-        # Check for address indicators
-        address_keywords = ['street', 'st', 'avenue', 'ave', 'road', 'rd', 'suite', 'floor', 'building']
-        has_address = any(keyword in text.lower() for keyword in address_keywords)
+        phones = self.signals.count('phone')
+        has_address = self.signals.count('address') > 0
         
         # Check for business name in footer or header
-        footer = self.soup.find('footer')
-        header = self.soup.find('header')
-        has_business_name = bool(footer or header)
+        has_business_name = bool(self.index.count('footer') or self.index.count('header'))
         
         score = 0
         if phones:
@@ -66,40 +76,35 @@ class GeoAnalyzer:
     
     def analyze_local_schema(self):
         """Analyze local business schema markup"""
-        # Check for LocalBusiness schema
-        schema_scripts = self.soup.find_all('script', type='application/ld+json')
-        
-        has_local_schema = False
-        for script in schema_scripts:
-            if script.string and ('LocalBusiness' in script.string or 
-                                'Organization' in script.string or
-                                'address' in script.string.lower()):
-                has_local_schema = True
-                break
-        
-        if has_local_schema:
-            return 10
-        else:
+        entities = self.structured_data['entities']
+        businesses = [entity for entity in entities if entity['kind'] == 'LocalBusiness']
+        has_local_schema = bool(businesses) or any(
+            entity['kind'] == 'Organization' or entity.get('address') for entity in entities
+        )
+        
+        if not has_local_schema:
             self.issues.append('Missing LocalBusiness schema markup')
             self.recommendations.append('Add LocalBusiness schema markup with NAP details, opening hours, and geo coordinates')
             return 0
+        
+        if businesses:
+            business = businesses[0]
+            missing = [label for key, label in (
+                ('address', 'address'),
+                ('telephone', 'telephone'),
+                ('geo', 'geo coordinates'),
+                ('opening_hours', 'opening hours')
+            ) if not business.get(key)]
+            if missing:
+                self.recommendations.append(f'Add {", ".join(missing)} to your {business["type"]} schema markup')
+        
+        return 10
     
     def analyze_local_keywords(self):
         """Analyze presence of local keywords"""
-        text = self.soup.get_text().lower()
+        found_patterns = sum(1 for kind in LOCAL_KEYWORDS if self.signals.count(kind))
         
-        # Common local keyword patterns
-        location_patterns = [
-            r'\bnear me\b',
-            r'\bin [A-Z][a-z]+(?:\s+[A-Z][a-z]+)?\b',
-            r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?\s+(?:city|town|area|region|county)\b',
-            r'\blocal\b',
-            r'\bnearby\b'
-        ]
-        
-        found_patterns = sum(1 for pattern in location_patterns if re.search(pattern, text))
-        
-        score = min((found_patterns / len(location_patterns)) * 10, 10)
+        score = min((found_patterns / len(LOCAL_KEYWORDS)) * 10, 10)
         
         if score < 5:
             self.recommendations.append('Include location-based keywords in your content (e.g., city name, "near me", "local")')
@@ -108,54 +113,36 @@ class GeoAnalyzer:
     
     def get_nap_info(self):
         """Get NAP information found on page"""
-        text = self.soup.get_text()
-        
-        # Extract phone numbers
-        phone_pattern = r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b|\(\d{3}\)\s*\d{3}[-.]?\d{4}'
-        phones = re.findall(phone_pattern, text)
-        
-        # Look for email
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
+        phones = self.signals.values('phone', limit=3)  # Unique phones, max 3
         
         return {
-            'phones': list(set(phones))[:3],  # Unique phones, max 3
-            'emails': list(set(emails))[:3],
+            'phones': phones,
+            'emails': self.signals.values('email', limit=3),
+            'has_address': self.signals.count('address') > 0,
             'has_nap': bool(phones)
         }
     
     def get_schema_info(self):
         """Get schema markup information"""
-        schema_scripts = self.soup.find_all('script', type='application/ld+json')
-        
-        schemas = []
-        for script in schema_scripts:
-            if script.string:
-                if 'LocalBusiness' in script.string:
-                    schemas.append('LocalBusiness')
-                elif 'Organization' in script.string:
-                    schemas.append('Organization')
+        structured_data = self.structured_data
+        entities = structured_data['entities']
         
         return {
-            'found': list(set(schemas)),
-            'count': len(set(schemas)),
-            'has_local': 'LocalBusiness' in schemas
+            'found': structured_data['types'],
+            'count': len(structured_data['types']),
+            'has_local': any(entity['kind'] == 'LocalBusiness' for entity in entities),
+            'formats': structured_data['formats'],
+            'entities': entities
         }
     
     def get_local_keywords(self):
         """Get local keywords found"""
-        text = self.soup.get_text().lower()
-        
-        keywords = []
-        if 'near me' in text:
-            keywords.append('near me')
-        if 'local' in text:
-            keywords.append('local')
-        if 'nearby' in text:
-            keywords.append('nearby')
+        keywords = [label for kind, label in LOCAL_KEYWORDS.items() if self.signals.count(kind)]
         
         return {
             'keywords': keywords,
-            'count': len(keywords)
+            'count': len(keywords),
+            'places': self.signals.values('locality', limit=5),
+            'mentions': {label: self.signals.count(kind) for kind, label in LOCAL_KEYWORDS.items()}
         }
 
@@ -1,19 +1,21 @@
 from urllib.parse import urljoin, urlparse
-import requests
+from backend.utils.dom_index import build_document_index
+from backend.utils.link_checker import get_link_checker
 
 class LinkAnalyzer:
     """Analyze links for SEO"""
     
-    def __init__(self, soup, url):
+    def __init__(self, soup, url, index=None):
         self.soup = soup
         self.url = url
+        self.index = index or build_document_index(soup)
         self.domain = urlparse(url).netloc
         self.issues = []
         self.recommendations = []
     
-    def analyze(self):
-        """Run all link analyses"""
-        links = self.soup.find_all('a', href=True)
+    def analyze(self, check_links=False):
+        """Run all link analyses, optionally checking every link target"""
+        links = self.index.anchors
         
         internal_links = []
         external_links = []
@@ -21,7 +23,7 @@ class LinkAnalyzer:
         nofollow_links = []
         
         for link in links:
-            href = link.get('href', '').strip()
+            href = link['href'].strip()
             if not href or href.startswith('#') or href.startswith('javascript:') or href.startswith('mailto:') or href.startswith('tel:'):
                 continue
             
@@ -33,25 +35,33 @@ class LinkAnalyzer:
             if link_domain == self.domain or link_domain == '':
                 internal_links.append({
                     'url': absolute_url,
-                    'text': link.get_text(strip=True),
-                    'rel': link.get('rel', [])
+                    'text': link['text'],
+                    'rel': link['rel']
                 })
             else:
                 external_links.append({
                     'url': absolute_url,
-                    'text': link.get_text(strip=True),
-                    'rel': link.get('rel', [])
+                    'text': link['text'],
+                    'rel': link['rel']
                 })
             
             # Check for nofollow
-            if 'nofollow' in link.get('rel', []):
+            if 'nofollow' in link['rel']:
                 nofollow_links.append(absolute_url)
         
+        # Check link targets
+        checked_count = 0
+        unchecked_count = 0
+        if check_links:
+            broken_links, checked_count, unchecked_count = self.find_broken_links(
+                [link['url'] for link in internal_links + external_links]
+            )
+        
         # Calculate score
-        score = self.calculate_link_score(internal_links, external_links)
+        score = self.calculate_link_score(internal_links, external_links, broken_links)
         
         # Generate recommendations
-        self.generate_recommendations(internal_links, external_links)
+        self.generate_recommendations(internal_links, external_links, broken_links)
         
         return {
             'score': score,
@@ -69,14 +79,35 @@ class LinkAnalyzer:
             },
             'broken': {
                 'count': len(broken_links),
-                'links': broken_links
+                'links': broken_links[:20],
+                'checked': checked_count,
+                'unchecked': unchecked_count
             },
             'total_links': len(links),
             'issues': self.issues,
             'recommendations': self.recommendations
         }
     
-    def calculate_link_score(self, internal_links, external_links):
+    def find_broken_links(self, urls):
+        """Check every unique http(s) link target concurrently"""
+        urls = [url for url in dict.fromkeys(urls) if urlparse(url).scheme in ('http', 'https')]
+        results = get_link_checker().check_all(urls)
+        
+        broken_links = []
+        unchecked_count = 0
+        for url, result in results.items():
+            if result['status'] == 'broken':
+                broken_links.append({
+                    'url': url,
+                    'status_code': result['status_code'],
+                    'error': result['error']
+                })
+            elif result['status'] == 'unchecked':
+                unchecked_count += 1
+        
+        return broken_links, len(results) - unchecked_count, unchecked_count
+    
+    def calculate_link_score(self, internal_links, external_links, broken_links=None):
         """Calculate link quality score (0-10)"""
         score = 10
         
@@ -106,10 +137,18 @@ class LinkAnalyzer:
             score -= 1
             self.issues.append(f'{empty_anchors} links with empty anchor text')
         
+        # Penalize for broken links
+        if broken_links:
+            score -= 2
+            self.issues.append(f'{len(broken_links)} broken links found')
+        
         return max(round(score, 1), 0)
     
-    def generate_recommendations(self, internal_links, external_links):
+    def generate_recommendations(self, internal_links, external_links, broken_links=None):
         """Generate link recommendations"""
+        if broken_links:
+            self.recommendations.append('Fix or remove broken links')
+        
         if len(internal_links) < 10:
             self.recommendations.append('Add more internal links to improve site navigation and SEO')
         
@@ -1,11 +1,12 @@
-from bs4 import BeautifulSoup
+from backend.utils.dom_index import build_document_index
 
 class MetadataAnalyzer:
     """Analyze metadata elements for SEO"""
     
-    def __init__(self, soup, url):
+    def __init__(self, soup, url, index=None):
         self.soup = soup
         self.url = url
+        self.index = index or build_document_index(soup)
         self.issues = []
         self.recommendations = []
     
@@ -33,14 +34,13 @@ class MetadataAnalyzer:
     
     def analyze_title(self):
         """Analyze title tag"""
-        title = self.soup.find('title')
-        if not title or not title.string:
+        title_info = self.get_title_info()
+        if not title_info['exists']:
             self.issues.append('Missing title tag')
             self.recommendations.append('Add a descriptive title tag (50-60 characters)')
             return 0
         
-        title_text = title.string.strip()
-        length = len(title_text)
+        length = title_info['length']
         
         if length < 30:
             self.issues.append(f'Title too short ({length} chars)')
@@ -55,15 +55,14 @@ class MetadataAnalyzer:
     
     def analyze_meta_description(self):
         """Analyze meta description"""
-        meta_desc = self.soup.find('meta', attrs={'name': 'description'})
+        desc_info = self.get_meta_description_info()
         
-        if not meta_desc or not meta_desc.get('content'):
+        if not desc_info['exists']:
             self.issues.append('Missing meta description')
             self.recommendations.append('Add a compelling meta description (150-160 characters)')
             return 0
         
-        desc_text = meta_desc.get('content', '').strip()
-        length = len(desc_text)
+        length = desc_info['length']
         
         if length < 120:
             self.issues.append(f'Meta description too short ({length} chars)')
@@ -78,22 +77,19 @@ class MetadataAnalyzer:
     
     def analyze_headings(self):
         """Analyze heading structure"""
-        h1_tags = self.soup.find_all('h1')
+        h1_count = self.index.count('h1')
         
-        if len(h1_tags) == 0:
+        if h1_count == 0:
             self.issues.append('Missing H1 tag')
             self.recommendations.append('Add a single H1 tag with primary keyword')
             return 0
-        elif len(h1_tags) > 1:
-            self.issues.append(f'Multiple H1 tags found ({len(h1_tags)})')
+        elif h1_count > 1:
+            self.issues.append(f'Multiple H1 tags found ({h1_count})')
             self.recommendations.append('Use only one H1 tag per page')
             return 6
         
         # Check for heading hierarchy
-        h2_tags = self.soup.find_all('h2')
-        h3_tags = self.soup.find_all('h3')
-        
-        if len(h2_tags) == 0 and len(h3_tags) > 0:
+        if self.index.count('h2') == 0 and self.index.count('h3') > 0:
             self.issues.append('Poor heading hierarchy (H3 without H2)')
             self.recommendations.append('Maintain proper heading hierarchy (H1 > H2 > H3)')
             return 7
@@ -102,7 +98,7 @@ class MetadataAnalyzer:
     
     def analyze_images(self):
         """Analyze image alt attributes"""
-        images = self.soup.find_all('img')
+        images = self.index.images
         
         if len(images) == 0:
             return 10  # No images, no issues
@@ -127,7 +123,7 @@ class MetadataAnalyzer:
         found_tags = []
         
         for tag in og_tags:
-            if self.soup.find('meta', property=tag):
+            if tag in self.index.meta_by_property:
                 found_tags.append(tag)
         
         score = (len(found_tags) / len(og_tags)) * 10
@@ -140,9 +136,9 @@ class MetadataAnalyzer:
     
     def get_title_info(self):
         """Get title tag information"""
-        title = self.soup.find('title')
-        if title and title.string:
-            text = title.string.strip()
+        title = self.index.title
+        if title:
+            text = title.strip()
             return {
                 'text': text,
                 'length': len(text),
@@ -152,9 +148,9 @@ class MetadataAnalyzer:
     
     def get_meta_description_info(self):
         """Get meta description information"""
-        meta_desc = self.soup.find('meta', attrs={'name': 'description'})
-        if meta_desc and meta_desc.get('content'):
-            text = meta_desc.get('content', '').strip()
+        content = self.index.meta_by_name.get('description')
+        if content:
+            text = content.strip()
             return {
                 'text': text,
                 'length': len(text),
@@ -165,16 +161,16 @@ class MetadataAnalyzer:
     def get_heading_info(self):
         """Get heading structure information"""
         return {
-            'h1_count': len(self.soup.find_all('h1')),
-            'h2_count': len(self.soup.find_all('h2')),
-            'h3_count': len(self.soup.find_all('h3')),
-            'h4_count': len(self.soup.find_all('h4')),
-            'h1_text': [h1.get_text(strip=True) for h1 in self.soup.find_all('h1')]
+            'h1_count': self.index.count('h1'),
+            'h2_count': self.index.count('h2'),
+            'h3_count': self.index.count('h3'),
+            'h4_count': self.index.count('h4'),
+            'h1_text': list(self.index.headings['h1'])
         }
     
     def get_image_info(self):
         """Get image information"""
-        images = self.soup.find_all('img')
+        images = self.index.images
         total = len(images)
         with_alt = sum(1 for img in images if img.get('alt'))
         
@@ -191,9 +187,8 @@ class MetadataAnalyzer:
         found = {}
         
         for tag in og_tags:
-            meta_tag = self.soup.find('meta', property=tag)
-            if meta_tag:
-                found[tag] = meta_tag.get('content', '')
+            if tag in self.index.meta_by_property:
+                found[tag] = self.index.meta_by_property[tag] or ''
         
         return {
             'tags': found,
@@ -1,5 +1,8 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from backend.utils.helpers import fetch_url, parse_html, normalize_url, is_valid_url
-from backend.utils.lighthouse import run_lighthouse_analysis
+from backend.utils.dom_index import build_document_index
+from backend.utils.lighthouse import start_lighthouse_analysis
 from backend.analyzers.metadata_analyzer import MetadataAnalyzer
 from backend.analyzers.link_analyzer import LinkAnalyzer
 from backend.analyzers.content_analyzer import ContentAnalyzer
@@ -9,50 +12,109 @@ from config import Config
 class SEOAnalyzer:
     """Main SEO analysis coordinator"""
     
-    def __init__(self, url):
-        self.url = normalize_url(url)
+    def __init__(self, url, page=None):
+        # A pre-fetched page (e.g. from a local file or archive) skips the fetch
+        self.url = url if page is not None else normalize_url(url)
+        self.page = page
         self.soup = None
+        self.index = None
         self.response = None
         
-    def analyze(self, include_performance=True, include_geo=False):
-        """Run complete SEO analysis"""
+    def analyze(self, include_performance=True, include_geo=False, check_links=None, on_progress=None):
+        """
+        Run complete SEO analysis
+        on_progress, if given, is called with (section, results) as each section finishes
+        """
+        if on_progress is None:
+            on_progress = _ignore_progress
         
-        # Validate URL
-        if not is_valid_url(self.url):
+        sections = self.iter_analysis(
+            include_performance=include_performance,
+            include_geo=include_geo,
+            check_links=check_links
+        )
+        results = {}
+        
+        try:
+            for section, payload in sections:
+                if section == 'error':
+                    return {'success': False, **payload}
+                on_progress(section, payload)
+                results[section] = payload
+        except Exception as e:
+            sections.close()
             return {
                 'success': False,
-                'error': 'Invalid URL format'
+                'url': self.url,
+                'error': str(e)
             }
         
+        return build_result(self.url, results)
+    
+    def iter_analysis(self, include_performance=True, include_geo=False, check_links=None):
+        """
+        Run the analysis incrementally, yielding (section, results) as each part is ready
+        Sections come in order: fetch, metadata, links, content, geo (optional),
+        performance (optional) and overall. A failure yields a final error section.
+        """
+        if check_links is None:
+            check_links = Config.LINK_CHECK_ENABLED
+        
+        # Validate URL
+        if self.page is None and not is_valid_url(self.url):
+            yield 'error', {'error': 'Invalid URL format'}
+            return
+        
+        # Start performance analysis (optional) in the background so it
+        # overlaps with fetching and analyzing the page
+        performance_future = None
+        cancel_performance = threading.Event()
+        if include_performance:
+            performance_future = start_lighthouse_analysis(self.url, cancel=cancel_performance)
+        
         try:
             # Fetch and parse URL
-            self.response = fetch_url(self.url, timeout=Config.TIMEOUT_SECONDS)
+            self.response = self.page or fetch_url(self.url, timeout=Config.TIMEOUT_SECONDS)
             self.soup = parse_html(self.response.text)
             
+            # Index the page once; every analyzer reads from the same index
+            self.index = build_document_index(self.soup)
+            
+            yield 'fetch', {
+                'url': self.url,
+                'status_code': self.response.status_code,
+                'response_time': self.response.elapsed.total_seconds(),
+                'cache_status': self.response.cache_status,
+                'truncated': self.response.truncated
+            }
+            
             # Run individual analyses
-            metadata_analyzer = MetadataAnalyzer(self.soup, self.url)
+            metadata_analyzer = MetadataAnalyzer(self.soup, self.url, index=self.index)
             metadata_results = metadata_analyzer.analyze()
+            yield 'metadata', metadata_results
             
-            link_analyzer = LinkAnalyzer(self.soup, self.url)
-            link_results = link_analyzer.analyze()
+            link_analyzer = LinkAnalyzer(self.soup, self.url, index=self.index)
+            link_results = link_analyzer.analyze(check_links=check_links)
+            yield 'links', link_results
             
-            content_analyzer = ContentAnalyzer(self.soup, self.url)
+            content_analyzer = ContentAnalyzer(self.soup, self.url, index=self.index)
             content_results = content_analyzer.analyze()
+            yield 'content', content_results
             
-            # Performance analysis (optional)
+            # GEO analysis (optional)
+            if include_geo:
+                geo_analyzer = GeoAnalyzer(self.soup, self.url, index=self.index)
+                yield 'geo', geo_analyzer.analyze()
+            
+            # Join the background performance analysis
             performance_results = None
-            if include_performance:
+            if performance_future:
                 try:
-                    performance_results = run_lighthouse_analysis(self.url)
+                    performance_results = performance_future.result()
                 except Exception as e:
                     print(f"Performance analysis failed: {str(e)}")
                     performance_results = {'score': 0, 'error': str(e)}
-            
-            # GEO analysis (optional)
-            geo_results = None
-            if include_geo:
-                geo_analyzer = GeoAnalyzer(self.soup, self.url)
-                geo_results = geo_analyzer.analyze()
+                yield 'performance', performance_results
             
             # Calculate overall SEO score
             overall_score = self.calculate_overall_score(
@@ -75,10 +137,10 @@ class SEOAnalyzer:
                 link_results.get('issues', []) +
                 content_results.get('issues', [])
             )
+            if self.response.truncated:
+                all_issues.append('Page is too large or too slow to download in full; only the first part was analyzed')
             
-            return {
-                'success': True,
-                'url': self.url,
+            yield 'overall', {
                 'overall_score': overall_score,
                 'scores': {
                     'metadata': metadata_results['score'],
@@ -86,23 +148,22 @@ class SEOAnalyzer:
                     'content': content_results['score'],
                     'performance': performance_results.get('overall_score', 0) if performance_results else 0
                 },
-                'metadata': metadata_results,
-                'links': link_results,
-                'content': content_results,
-                'performance': performance_results,
-                'geo': geo_results,
                 'recommendations': all_recommendations[:15],  # Top 15 recommendations
-                'issues': all_issues,
-                'status_code': self.response.status_code,
-                'response_time': self.response.elapsed.total_seconds()
+                'issues': all_issues
             }
             
         except Exception as e:
-            return {
-                'success': False,
+            yield 'error', {
                 'url': self.url,
                 'error': str(e)
             }
+        
+        finally:
+            # Also reached when the consumer stops early. A queued request is
+            # dropped; a running one skips the API call if it has not made it yet
+            if performance_future and not performance_future.done():
+                cancel_performance.set()
+                performance_future.cancel()
     
     def calculate_overall_score(self, metadata, links, content, performance):
         """Calculate weighted overall SEO score (0-10)"""
@@ -122,15 +183,48 @@ class SEOAnalyzer:
         return round(score, 1)
 
 
-def compare_seo(url1, url2):
+def build_result(url, sections):
+    """Assemble the analyze() result from the sections iter_analysis() yielded"""
+    fetch = sections['fetch']
+    overall = sections['overall']
+    return {
+        'success': True,
+        'url': url,
+        'overall_score': overall['overall_score'],
+        'scores': overall['scores'],
+        'metadata': sections['metadata'],
+        'links': sections['links'],
+        'content': sections['content'],
+        'performance': sections.get('performance'),
+        'geo': sections.get('geo'),
+        'recommendations': overall['recommendations'],
+        'issues': overall['issues'],
+        'status_code': fetch['status_code'],
+        'response_time': fetch['response_time'],
+        'cache_status': fetch['cache_status'],
+        'truncated': fetch['truncated']
+    }
+
+
+def compare_seo(url1, url2, concurrent=True, on_progress=None):
     """Compare SEO metrics between two URLs"""
+    if on_progress is None:
+        on_progress = _ignore_progress
     
-    # Analyze both URLs
-    analyzer1 = SEOAnalyzer(url1)
-    results1 = analyzer1.analyze(include_performance=True, include_geo=False)
-    
-    analyzer2 = SEOAnalyzer(url2)
-    results2 = analyzer2.analyze(include_performance=True, include_geo=False)
+    # Analyze both URLs, side by side unless sequential mode is requested
+    if concurrent:
+        with ThreadPoolExecutor(max_workers=Config.COMPARE_MAX_WORKERS) as executor:
+            future1 = executor.submit(_analyze_for_comparison, url1)
+            future2 = executor.submit(_analyze_for_comparison, url2)
+            results1 = future1.result()
+            on_progress('url1', results1)
+            results2 = future2.result()
+            on_progress('url2', results2)
+    else:
+        results1 = _analyze_for_comparison(url1)
+        on_progress('url1', results1)
+        results2 = _analyze_for_comparison(url2)
+        on_progress('url2', results2)
     
     if not results1['success'] or not results2['success']:
         return {
@@ -167,6 +261,23 @@ def compare_seo(url1, url2):
     }
 
 
+def _analyze_for_comparison(url):
+    """Analyze one side of a comparison, reporting failures instead of raising"""
+    try:
+        analyzer = SEOAnalyzer(url)
+        return analyzer.analyze(include_performance=True, include_geo=False)
+    except Exception as e:
+        return {
+            'success': False,
+            'url': url,
+            'error': str(e)
+        }
+
+
+def _ignore_progress(section, results):
+    pass
+
+
 def get_better_categories(score_diff, url):
     """Get categories where a URL performs better"""
     better = []
@@ -0,0 +1,232 @@
+import asyncio
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+from backend.analyzers.seo_analyzer import SEOAnalyzer
+from backend.utils.helpers import canonicalize_url, normalize_url, is_valid_url
+from backend.utils.duplicates import DuplicateIndex
+from backend.utils.tfidf import TfidfCorpus, term_counts
+from config import Config
+
+# Links that never lead to another crawlable page
+SKIPPED_LINK_PREFIXES = ('#', 'javascript:', 'mailto:', 'tel:', 'data:')
+SKIPPED_EXTENSIONS = (
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.ico',
+    '.css', '.js', '.json', '.xml', '.zip', '.gz', '.mp3', '.mp4', '.avi', '.mov'
+)
+
+# Per-page details such as counts and quoted keywords, stripped so the
+# same issue on different pages aggregates together
+ISSUE_DETAILS = re.compile(r'^\d+\s+|\s*\([^)]*\)|\s*"[^"]*"')
+
+
+class SiteCrawler:
+    """
+    Breadth-first crawl of a site's internal links, analyzing every page
+    asyncio schedules the crawl; each page runs the regular SEOAnalyzer
+    pipeline on a worker thread so the pooled HTTP client is reused
+    """
+
+    def __init__(self, seed_url, max_pages=None, max_depth=None, concurrency=None, per_host_limit=None,
+                 on_progress=None):
+        self.seed_url = canonicalize_url(normalize_url(seed_url))
+        self.hosts = {urlparse(self.seed_url).netloc}
+        self.max_pages = max_pages or Config.CRAWL_MAX_PAGES
+        self.max_depth = Config.CRAWL_MAX_DEPTH if max_depth is None else max_depth
+        self.concurrency = concurrency or Config.CRAWL_CONCURRENCY
+        self.per_host_limit = per_host_limit or Config.CRAWL_PER_HOST_LIMIT
+        self.on_progress = on_progress
+        self.stopped = None  # Exception raised by on_progress, e.g. a cancelled job
+
+        self.seen = set()
+        self.queued = 0
+        self.pages = []
+        self.errors = []
+        self.issue_counts = Counter()
+        self.corpus = TfidfCorpus()
+        self.duplicates = DuplicateIndex()
+        self._host_semaphores = {}
+
+    def run(self):
+        """Crawl the site and return the site-level report"""
+        return asyncio.run(self.crawl())
+
+    async def crawl(self):
+        """Crawl the site from the event loop and return the site-level report"""
+        if not is_valid_url(self.seed_url):
+            return {
+                'success': False,
+                'error': 'Invalid URL format'
+            }
+
+        started = time.time()
+        queue = asyncio.Queue()
+        self._enqueue(queue, self.seed_url, 0)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='crawler') as executor:
+            workers = [
+                asyncio.create_task(self._worker(queue, executor))
+                for _ in range(self.concurrency)
+            ]
+            await queue.join()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        if self.stopped is not None:
+            raise self.stopped
+        return self.build_report(time.time() - started)
+
+    def _enqueue(self, queue, url, depth):
+        """Queue a URL unless it was already seen or the page budget is spent"""
+        if url in self.seen or self.queued >= self.max_pages or self.stopped is not None:
+            return
+        self.seen.add(url)
+        self.queued += 1
+        queue.put_nowait((url, depth))
+
+    def _host_semaphore(self, url):
+        host = urlparse(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_semaphores[host]
+
+    async def _worker(self, queue, executor):
+        loop = asyncio.get_running_loop()
+        while True:
+            url, depth = await queue.get()
+            try:
+                if self.stopped is not None:
+                    continue
+                async with self._host_semaphore(url):
+                    result, links, counts = await loop.run_in_executor(executor, self.analyze_page, url)
+                self.record_page(url, depth, result, counts)
+                self.report_progress()
+
+                if depth < self.max_depth:
+                    for link in links:
+                        self._enqueue(queue, link, depth + 1)
+            except Exception as e:
+                self.errors.append({'url': url, 'error': str(e)})
+            finally:
+                queue.task_done()
+
+    def report_progress(self):
+        """Pass crawl counters to on_progress; an exception from it stops the crawl"""
+        if self.on_progress is None:
+            return
+        try:
+            self.on_progress('progress', {
+                'pages_crawled': len(self.pages),
+                'pages_failed': len(self.errors),
+                'pages_queued': self.queued
+            })
+        except Exception as e:
+            self.stopped = e
+
+    def analyze_page(self, url):
+        """
+        Analyze one page on a worker thread
+        Returns the result, the page's crawlable internal links and its term
+        counts for the site-wide keyword corpus
+        """
+        analyzer = SEOAnalyzer(url)
+        result = analyzer.analyze(include_performance=False, include_geo=False, check_links=False)
+        if not result['success'] or analyzer.index is None:
+            return result, [], None
+
+        page_url = analyzer.response.url
+        if url == self.seed_url:
+            # A seed that redirects (apex to www., http to https on another
+            # host) moves the crawl to where it landed. Only the seed is in
+            # flight at this point, so nothing else reads these sets yet
+            self.hosts.add(urlparse(page_url).netloc)
+            self.seen.add(canonicalize_url(page_url))
+
+        counts = term_counts(analyzer.index.visible_text, analyzer.index.language,
+                             self.corpus.max_terms_per_doc)
+        return result, self.extract_internal_links(page_url, analyzer.index.anchors), counts
+
+    def extract_internal_links(self, page_url, anchors):
+        """Absolute, canonical URLs of the internal links on a page"""
+        links = []
+        for anchor in anchors:
+            href = anchor['href'].strip()
+            if not href or href.lower().startswith(SKIPPED_LINK_PREFIXES):
+                continue
+
+            url = canonicalize_url(urljoin(page_url, href))
+            parsed = urlparse(url)
+            if parsed.scheme not in ('http', 'https') or parsed.netloc not in self.hosts:
+                continue
+            if parsed.path.lower().endswith(SKIPPED_EXTENSIONS):
+                continue
+            links.append(url)
+        return links
+
+    def record_page(self, url, depth, result, counts=None):
+        """Keep a compact per-page summary so memory stays flat on large sites"""
+        if not result['success']:
+            self.errors.append({'url': url, 'error': result.get('error')})
+            return
+
+        # Only the event loop thread touches the corpus
+        if counts is not None:
+            self.corpus.add_counts(url, counts)
+        fingerprint = result['content'].get('simhash')
+        if fingerprint:
+            self.duplicates.add_fingerprint(url, int(fingerprint, 16))
+
+        for issue in set(ISSUE_DETAILS.sub('', issue) for issue in result['issues']):
+            self.issue_counts[issue] += 1
+
+        self.pages.append({
+            'url': url,
+            'depth': depth,
+            'status_code': result['status_code'],
+            'overall_score': result['overall_score'],
+            'scores': result['scores'],
+            'issue_count': len(result['issues'])
+        })
+
+    def build_report(self, elapsed):
+        """Site-level report: per-page scores plus aggregate issues"""
+        pages = sorted(self.pages, key=lambda page: (page['depth'], page['url']))
+        distinctive = self.corpus.top_terms(Config.DISTINCTIVE_KEYWORDS)
+        for page in pages:
+            page['distinctive_keywords'] = [
+                {'keyword': term, 'weight': weight}
+                for term, weight in distinctive.get(page['url'], [])
+            ]
+        scores = [page['overall_score'] for page in pages]
+        average = round(sum(scores) / len(scores), 1) if scores else 0
+
+        report = {
+            'success': bool(pages),
+            'seed_url': self.seed_url,
+            'pages_crawled': len(pages),
+            'pages_failed': len(self.errors),
+            'average_score': average,
+            'elapsed_seconds': round(elapsed, 2),
+            'aggregate_issues': [
+                {'issue': issue, 'pages': count}
+                for issue, count in self.issue_counts.most_common()
+            ],
+            'duplicate_clusters': self.duplicates.clusters(),
+            'pages': pages,
+            'errors': self.errors[:100]
+        }
+        if not pages:
+            report['error'] = self.errors[0]['error'] if self.errors else 'No pages could be analyzed'
+        return report
+
+
+def crawl_site(seed_url, max_pages=None, max_depth=None, on_progress=None):
+    """
+    Crawl a site from a seed URL and return the site-level report
+    on_progress, if given, is called with ('progress', counters) after every page
+    """
+    crawler = SiteCrawler(seed_url, max_pages=max_pages, max_depth=max_depth, on_progress=on_progress)
+    return crawler.run()
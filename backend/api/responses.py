@@ -0,0 +1,114 @@
+import gzip
+import hashlib
+import json
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from config import Config
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; responses fall back to the standard encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # Without brotli, only gzip is offered
+    brotli = None
+
+# Streamed bodies must reach the client as they are produced
+STREAMING_MIMETYPES = {'text/event-stream', 'application/x-ndjson'}
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/javascript', 'application/xml', 'image/svg+xml'}
+
+
+def dumps_bytes(obj, indent=False):
+    """Serialize to UTF-8 JSON bytes with orjson when available"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=option)
+    separators = None if indent else (',', ':')
+    return json.dumps(obj, default=DefaultJSONProvider.default, ensure_ascii=False,
+                      indent=2 if indent else None, separators=separators).encode('utf-8')
+
+
+def dumps(obj):
+    """Serialize to a compact JSON string, e.g. for NDJSON lines and SSE events"""
+    return dumps_bytes(obj).decode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson
+    jsonify() keeps working unchanged; response bodies are built as bytes
+    directly, without an intermediate str
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs.get('sort_keys'):
+            return super().dumps(obj, **kwargs)
+        return dumps_bytes(obj, indent=bool(kwargs.get('indent'))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(dumps_bytes(obj, indent=indent) + b'\n', mimetype=self.mimetype)
+
+
+def is_compressible(response):
+    mimetype = response.mimetype or ''
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_MIMETYPES
+
+
+def choose_encoding():
+    """Best content coding the client accepts, preferring brotli over gzip"""
+    offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return request.accept_encodings.best_match(offered)
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=Config.COMPRESS_BROTLI_QUALITY)
+    # mtime=0 keeps the output (and so the ETag) stable
+    return gzip.compress(body, compresslevel=Config.COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+def finalize_response(response):
+    """
+    Add a strong ETag to GET responses (answering 304 when it matches)
+    and compress bodies over Config.COMPRESS_MIN_SIZE
+    Streamed responses (SSE, NDJSON, files) are passed through untouched.
+    """
+    if (response.is_streamed or response.direct_passthrough
+            or response.mimetype in STREAMING_MIMETYPES
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    body = response.get_data()
+    encoding = None
+    if len(body) >= Config.COMPRESS_MIN_SIZE and is_compressible(response):
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding()
+
+    if request.method in ('GET', 'HEAD') and response.status_code == 200:
+        # Each encoding is a different representation, so it gets its own tag
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        response.set_etag(f'{digest}-{encoding}' if encoding else digest)
+        if request.if_none_match.contains_weak(response.get_etag()[0]):
+            response.status_code = 304
+            response.set_data(b'')
+            return response
+
+    if encoding:
+        response.set_data(compress(body, encoding))
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_app(app):
+    """Use the fast JSON provider and compress/ETag every response of an app"""
+    app.json = FastJSONProvider(app)
+    app.after_request(finalize_response)
@@ -1,7 +1,15 @@
-from flask import Blueprint, request, jsonify
-from backend.analyzers.seo_analyzer import SEOAnalyzer, compare_seo
+from itertools import chain, islice
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from backend.analyzers.seo_analyzer import SEOAnalyzer, build_result, compare_seo
 from backend.analyzers.geo_analyzer import GeoAnalyzer
+from backend.analyzers.site_crawler import crawl_site
+from backend.analyzers.batch_analyzer import iter_analyses
+from backend.api.responses import dumps
 from backend.utils.helpers import is_valid_url, normalize_url, fetch_url, parse_html
+from backend.utils.cache import page_cache
+from backend.utils.history import get_history_store, history_stats, record_analysis
+from backend.utils.job_queue import JobQueueFull, job_queue
+from backend.utils.sitemap import iter_sitemap_urls, parse_lastmod
 from config import Config
 
 api_bp = Blueprint('api', __name__)
@@ -21,6 +29,8 @@ def analyze_url():
     url = data.get('url')
     include_performance = data.get('include_performance', True)
     include_geo = data.get('include_geo', False)
+    check_links = data.get('check_links')
+    max_age = data.get('max_age')
     
     # Normalize and validate URL
     url = normalize_url(url)
@@ -31,14 +41,26 @@ def analyze_url():
             'error': 'Invalid URL format'
         }), 400
     
+    if max_age is not None:
+        if not isinstance(max_age, (int, float)) or isinstance(max_age, bool) or max_age < 0:
+            return jsonify({
+                'success': False,
+                'error': 'max_age must be a non-negative number of seconds'
+            }), 400
+        
+        # Answer from the history when a recent enough analysis is stored
+        store = get_history_store()
+        stored = store.latest(url, max_age, include_performance, include_geo) if store else None
+        if stored is not None:
+            stored['from_history'] = True
+            return jsonify(stored)
+    
+    if data.get('async'):
+        return submit_job('analyze', _run_analysis, url, include_performance, include_geo, check_links)
+    
     # Run analysis
     try:
-        analyzer = SEOAnalyzer(url)
-        results = analyzer.analyze(
-            include_performance=include_performance,
-            include_geo=include_geo
-        )
-        
+        results = _run_analysis(url, include_performance, include_geo, check_links)
         return jsonify(results)
     
     except Exception as e:
@@ -48,10 +70,63 @@ def analyze_url():
         }), 500
 
 
-@api_bp.route('/compare', methods=['POST'])
+@api_bp.route('/analyze/stream', methods=['GET'])
+def analyze_url_stream():
+    """Analyze a single URL, pushing each section as a Server-Sent Event when it is ready"""
+    url = normalize_url(request.args.get('url', '').strip())
+    include_performance = request.args.get('include_performance', 'true').lower() == 'true'
+    include_geo = request.args.get('include_geo', 'false').lower() == 'true'
+    check_links = request.args.get('check_links')
+    if check_links is not None:
+        check_links = check_links.lower() == 'true'
+    
+    error = None
+    if not request.args.get('url'):
+        error = 'URL is required'
+    elif not is_valid_url(url):
+        error = 'Invalid URL format'
+    
+    def generate():
+        # EventSource cannot read error responses, so failures are events too
+        if error:
+            yield sse_event('failed', {'error': error})
+            return
+        
+        analyzer = SEOAnalyzer(url)
+        sections = analyzer.iter_analysis(
+            include_performance=include_performance,
+            include_geo=include_geo,
+            check_links=check_links
+        )
+        results = {}
+        for section, payload in sections:
+            if section == 'error':
+                yield sse_event('failed', payload)
+                return
+            results[section] = payload
+            yield sse_event(section, payload)
+        record_analysis(build_result(url, results), include_performance, include_geo)
+        yield sse_event('done', {'url': url})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Keep reverse proxies from buffering the stream
+        }
+    )
+
+
+def sse_event(event, data):
+    """Format one Server-Sent Event"""
+    return f'event: {event}\ndata: {dumps(data)}\n\n'
+
+
+@api_bp.route('/compare', methods=['GET', 'POST'])
 def compare_urls():
     """Compare SEO metrics between two URLs"""
-    data = request.get_json()
+    data = _request_data()
     
     if not data or 'url1' not in data or 'url2' not in data:
         return jsonify({
@@ -61,6 +136,9 @@ def compare_urls():
     
     url1 = normalize_url(data.get('url1'))
     url2 = normalize_url(data.get('url2'))
+    concurrent = data.get('concurrent', True)
+    if isinstance(concurrent, str):
+        concurrent = concurrent.lower() == 'true'
     
     if not is_valid_url(url1) or not is_valid_url(url2):
         return jsonify({
@@ -68,9 +146,63 @@ def compare_urls():
             'error': 'Invalid URL format'
         }), 400
     
+    if data.get('async'):
+        return submit_job('compare', _run_comparison, url1, url2, concurrent)
+    
     # Run comparison
     try:
-        results = compare_seo(url1, url2)
+        results = _run_comparison(url1, url2, concurrent)
+        return jsonify(results)
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@api_bp.route('/crawl', methods=['POST'])
+def crawl():
+    """Crawl a site's internal links and analyze every page"""
+    data = request.get_json()
+    
+    if not data or 'url' not in data:
+        return jsonify({
+            'success': False,
+            'error': 'URL is required'
+        }), 400
+    
+    url = normalize_url(data.get('url'))
+    
+    if not is_valid_url(url):
+        return jsonify({
+            'success': False,
+            'error': 'Invalid URL format'
+        }), 400
+    
+    try:
+        max_pages = int(data.get('max_pages', Config.CRAWL_MAX_PAGES))
+        max_depth = int(data.get('max_depth', Config.CRAWL_MAX_DEPTH))
+    except (TypeError, ValueError):
+        return jsonify({
+            'success': False,
+            'error': 'max_pages and max_depth must be integers'
+        }), 400
+    
+    if max_pages < 1 or max_depth < 0:
+        return jsonify({
+            'success': False,
+            'error': 'max_pages must be at least 1 and max_depth at least 0'
+        }), 400
+    
+    if data.get('async'):
+        # Large crawls run as a background job, with a higher page bound
+        return submit_job('crawl', crawl_site, url, min(max_pages, Config.CRAWL_JOB_MAX_PAGES), max_depth)
+    
+    max_pages = min(max_pages, Config.CRAWL_MAX_PAGES)
+    
+    try:
+        results = crawl_site(url, max_pages=max_pages, max_depth=max_depth)
         return jsonify(results)
     
     except Exception as e:
@@ -80,10 +212,76 @@ def compare_urls():
         }), 500
 
 
-@api_bp.route('/geo-analyze', methods=['POST'])
+@api_bp.route('/batch', methods=['POST'])
+def batch_analyze():
+    """Analyze many URLs (a list or a sitemap), streaming one JSON result per line as each finishes"""
+    if request.mimetype == 'text/plain':
+        # One URL per line, read from the request body as the batch goes
+        urls = (line.decode('utf-8', 'replace') for line in request.stream)
+        options = {}
+    else:
+        data = request.get_json(silent=True) or {}
+        options = data
+        if data.get('sitemap'):
+            sitemap_url = normalize_url(data['sitemap'])
+            if not is_valid_url(sitemap_url):
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid sitemap URL'
+                }), 400
+            if data.get('since') and parse_lastmod(data['since']) is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid since date, expected YYYY-MM-DD or an ISO 8601 timestamp'
+                }), 400
+            
+            # Read the first URL up front so a broken sitemap is a 400, not a cut-off stream
+            urls = iter_sitemap_urls(sitemap_url, since=data.get('since'))
+            try:
+                urls = chain([next(urls)], urls)
+            except StopIteration:
+                urls = []
+            except Exception as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 400
+        elif isinstance(data.get('urls'), list):
+            urls = data['urls']
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'A list of URLs or a sitemap URL is required'
+            }), 400
+    
+    if isinstance(urls, list) and len(urls) > Config.BATCH_MAX_URLS:
+        return jsonify({
+            'success': False,
+            'error': f'At most {Config.BATCH_MAX_URLS} URLs per batch'
+        }), 400
+    
+    include_performance = options.get('include_performance', False)
+    include_geo = options.get('include_geo', False)
+    results = iter_analyses(
+        (normalize_url(url.strip()) for url in islice(urls, Config.BATCH_MAX_URLS)
+         if isinstance(url, str) and url.strip()),
+        include_performance=include_performance,
+        include_geo=include_geo,
+        check_links=options.get('check_links', False)
+    )
+    
+    def generate():
+        for result in results:
+            record_analysis(result, include_performance, include_geo)
+            yield dumps(result) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@api_bp.route('/geo-analyze', methods=['GET', 'POST'])
 def geo_analyze():
     """Analyze local/GEO SEO for a URL"""
-    data = request.get_json()
+    data = _request_data()
     
     if not data or 'url' not in data:
         return jsonify({
@@ -100,21 +298,11 @@ def geo_analyze():
             'error': 'Invalid URL format'
         }), 400
     
+    if data.get('async'):
+        return submit_job('geo-analyze', _run_geo_analysis, url, location)
+    
     try:
-        # Fetch and parse
-        response = fetch_url(url)
-        soup = parse_html(response.text)
-        
-        # Run GEO analysis
-        analyzer = GeoAnalyzer(soup, url)
-        results = analyzer.analyze(location=location)
-        
-        return jsonify({
-            'success': True,
-            'url': url,
-            'location': location,
-            'results': results
-        })
+        return jsonify(_run_geo_analysis(url, location))
     
     except Exception as e:
         return jsonify({
@@ -123,15 +311,207 @@ def geo_analyze():
         }), 500
 
 
+@api_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status, partial results and final result of a background job"""
+    job = job_queue.get(job_id)
+    
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found or expired'
+        }), 404
+    
+    return jsonify(job.to_dict())
+
+
+@api_bp.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a queued or running background job"""
+    job = job_queue.cancel(job_id)
+    
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found or expired'
+        }), 404
+    
+    return jsonify(job.to_dict())
+
+
+@api_bp.route('/history/latest', methods=['GET'])
+def history_latest():
+    """Most recent stored analysis of a URL"""
+    store, url, error = _history_request('url')
+    if error:
+        return error
+    
+    result = store.latest(normalize_url(url))
+    if result is None:
+        return jsonify({
+            'success': False,
+            'error': 'No analysis stored for this URL'
+        }), 404
+    
+    result['from_history'] = True
+    return jsonify(result)
+
+
+@api_bp.route('/history', methods=['GET'])
+def history():
+    """Score history of a URL, newest first"""
+    store, url, error = _history_request('url')
+    if error:
+        return error
+    
+    url = normalize_url(url)
+    analyses = store.history(url, limit=_history_limit(50))
+    if not analyses:
+        return jsonify({
+            'success': False,
+            'error': 'No analysis stored for this URL'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'url': url,
+        'count': len(analyses),
+        'analyses': analyses
+    })
+
+
+@api_bp.route('/history/worst', methods=['GET'])
+def history_worst():
+    """Lowest-scoring pages of a domain, by their latest analysis"""
+    store, domain, error = _history_request('domain')
+    if error:
+        return error
+    
+    pages = store.worst_pages(domain, limit=_history_limit(20))
+    if not pages:
+        return jsonify({
+            'success': False,
+            'error': 'No analysis stored for this domain'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'domain': domain,
+        'count': len(pages),
+        'pages': pages
+    })
+
+
+def _history_request(param):
+    """The history store and a required query parameter, or an error response"""
+    store = get_history_store()
+    if store is None:
+        return None, None, (jsonify({
+            'success': False,
+            'error': 'Analysis history is disabled or unavailable'
+        }), 404)
+    
+    value = request.args.get(param, '').strip()
+    if not value:
+        return None, None, (jsonify({
+            'success': False,
+            'error': f'{param} is required'
+        }), 400)
+    
+    return store, value, None
+
+
+def _history_limit(default):
+    try:
+        limit = int(request.args.get('limit', default))
+    except ValueError:
+        limit = default
+    return min(max(limit, 1), Config.HISTORY_MAX_LIMIT)
+
+
 @api_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'message': 'SEO Analysis API is running'
+        'message': 'SEO Analysis API is running',
+        'page_cache': page_cache.stats() if page_cache else None,
+        'jobs': job_queue.stats(),
+        'history': history_stats()
     })
 
 
+def _request_data():
+    """
+    Parameters from a POST body or, for GET, the query string
+    GET answers carry an ETag, so repeated dashboard loads revalidate to a
+    304; they always run in the request and never start a background job
+    """
+    if request.method == 'GET':
+        data = request.args.to_dict()
+        data.pop('async', None)
+        return data
+    return request.get_json()
+
+
+def submit_job(kind, func, *args):
+    """Queue an analysis as a background job and answer with its id"""
+    try:
+        job = job_queue.submit(kind, func, *args)
+    except JobQueueFull as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 503
+    
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f'/api/jobs/{job.id}'
+    }), 202
+
+
+def _run_analysis(url, include_performance, include_geo, check_links, on_progress=None):
+    analyzer = SEOAnalyzer(url)
+    results = analyzer.analyze(
+        include_performance=include_performance,
+        include_geo=include_geo,
+        check_links=check_links,
+        on_progress=on_progress
+    )
+    record_analysis(results, include_performance, include_geo)
+    return results
+
+
+def _run_comparison(url1, url2, concurrent, on_progress=None):
+    def report(section, results):
+        # Each side is a full analysis, so it goes into the history as well
+        if section in ('url1', 'url2'):
+            record_analysis(results, include_performance=True)
+        if on_progress is not None:
+            on_progress(section, results)
+    
+    return compare_seo(url1, url2, concurrent=concurrent, on_progress=report)
+
+
+def _run_geo_analysis(url, location, on_progress=None):
+    # Fetch and parse
+    response = fetch_url(url)
+    soup = parse_html(response.text)
+    
+    # Run GEO analysis
+    analyzer = GeoAnalyzer(soup, url)
+    results = analyzer.analyze(location=location)
+    
+    return {
+        'success': True,
+        'url': url,
+        'location': location,
+        'results': results
+    }
+
+
 @api_bp.route('/keywords', methods=['POST'])
 def suggest_keywords():
     """Suggest keywords based on content"""
@@ -168,6 +548,8 @@ def suggest_keywords():
             'success': True,
             'url': url,
             'keywords': keywords[:20],
+            'phrases': results.get('phrases', []),
+            'language': results.get('language'),
             'local_suggestions': local_suggestions,
             'top_keyword': results.get('top_keyword')
         })
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+
+class CacheEntry:
+    """Cached page body plus the validators needed to revalidate it"""
+
+    def __init__(self, url, status_code, headers, content, encoding, truncated=False, elapsed=None,
+                 final_url=None):
+        self.url = url  # Requested URL, the cache key
+        self.final_url = final_url or url  # Where redirects ended; relative links resolve against it
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+        self.truncated = truncated
+        self.elapsed = elapsed  # Response time of the original download
+        self.etag = headers.get('ETag')
+        self.last_modified = headers.get('Last-Modified')
+        self.stored_at = time.time()
+        self.size = len(content)
+
+    def is_fresh(self, ttl):
+        """Check if the entry is still inside its TTL"""
+        return time.time() - self.stored_at < ttl
+
+    def can_revalidate(self):
+        """Check if the origin gave us a validator to revalidate with"""
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self):
+        """Build If-None-Match / If-Modified-Since request headers"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """
+    In-memory LRU cache of fetched pages, bounded by total body size
+    Stale entries are kept so they can be revalidated with the origin
+    """
+
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'evictions': 0}
+
+    def get(self, url):
+        """Get the entry for a URL (fresh or stale) and mark it recently used"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def put(self, entry):
+        """Store an entry, evicting least recently used pages over budget"""
+        if entry.size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(entry.url, None)
+            if old is not None:
+                self._bytes -= old.size
+
+            self._entries[entry.url] = entry
+            self._bytes += entry.size
+
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._stats['evictions'] += 1
+
+    def refresh(self, entry):
+        """Restart the TTL of an entry the origin confirmed unchanged"""
+        with self._lock:
+            entry.stored_at = time.time()
+
+    def record(self, outcome):
+        """Count a hit, miss or revalidation"""
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def clear(self):
+        """Drop every cached page"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Get cache counters and current size"""
+        with self._lock:
+            return {
+                **self._stats,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+class DiskCache:
+    """
+    JSON result cache stored as one file per key in a directory
+    Shared by every worker process on the same machine. Expired files are
+    deleted when read and by a periodic sweep on write, so the directory
+    does not grow for the life of the deployment
+    """
+
+    def __init__(self, directory, ttl):
+        self.directory = directory
+        self.ttl = ttl
+        self.prune_interval = min(ttl, 60 * 60)
+        self._last_pruned = 0
+
+    def _path(self, key):
+        digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f'{digest}.json')
+
+    def get(self, key):
+        """Get a cached value, or None if missing, expired or unreadable"""
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - record.get('stored_at', 0) >= self.ttl:
+            self._remove(self._path(key))
+            return None
+        return record.get('value')
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # Already removed by another worker
+
+    def prune(self):
+        """Delete expired entries (and temp files left by interrupted writes)"""
+        self._last_pruned = time.time()
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        # A file's mtime is when it was stored, so no need to open it
+        cutoff = time.time() - self.ttl
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                expired = os.path.getmtime(path) < cutoff
+            except OSError:
+                continue
+            if expired:
+                self._remove(path)
+
+    def set(self, key, value):
+        """Store a value, replacing the file atomically"""
+        path = self._path(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'stored_at': time.time(), 'value': value}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Disk cache write failed: {str(e)}")
+            return
+
+        if time.time() - self._last_pruned >= self.prune_interval:
+            self.prune()
+
+
+def create_page_cache():
+    """Create the page cache described by Config, or None if disabled"""
+    if Config.CACHE_TYPE == 'null':
+        return None
+    return PageCache(Config.CACHE_MAX_BYTES, Config.CACHE_DEFAULT_TIMEOUT)
+
+page_cache = create_page_cache()
+
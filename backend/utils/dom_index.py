@@ -0,0 +1,278 @@
+from collections import Counter
+from bs4 import CData, NavigableString, Tag
+from lxml import etree
+
+# Elements whose stripped text the analyzers report
+TEXT_CAPTURE_TAGS = {'title', 'a', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+# Subtrees left out of the visible page text the content analysis uses
+EXCLUDED_TEXT_TAGS = {'script', 'style', 'nav', 'footer', 'header'}
+
+# String classes BeautifulSoup treats as document text (get_text() skips
+# comments, doctypes and the contents of script/style/template)
+TEXT_STRING_TYPES = (NavigableString, CData)
+
+# Elements whose strings BeautifulSoup does not treat as document text
+NON_TEXT_CONTAINERS = {'script', 'style', 'template', 'rt', 'rp'}
+
+# Elements inside which BeautifulSoup keeps whitespace-only strings as-is
+PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+# Attribute holding a microdata/RDFa property value, by element; other
+# elements take their text content
+PROPERTY_VALUE_ATTRS = {
+    'a': 'href', 'area': 'href', 'link': 'href',
+    'audio': 'src', 'embed': 'src', 'iframe': 'src', 'img': 'src',
+    'source': 'src', 'track': 'src', 'video': 'src',
+    'object': 'data', 'time': 'datetime', 'data': 'value', 'meter': 'value'
+}
+
+
+class DocumentIndex:
+    """
+    Everything the analyzers look up in a page, collected in one traversal
+    Analyzers read from here instead of searching the parse tree again
+    """
+
+    def __init__(self):
+        self.tag_counts = Counter()
+        self.title = None
+        self.language = None
+        self.meta_by_name = {}
+        self.meta_by_property = {}
+        self.headings = {f'h{level}': [] for level in range(1, 7)}
+        self.anchors = []
+        self.images = []
+        self.json_ld = []
+        self.microdata = []  # Top-level itemscope items as nested dicts
+        self.rdfa = []  # Top-level typeof items as nested dicts
+        self.text = ''
+        self.visible_text = ''
+
+    def count(self, tag):
+        """Number of elements with the given tag name"""
+        return self.tag_counts.get(tag, 0)
+
+
+class IndexBuilder:
+    """
+    Builds a DocumentIndex from start/data/end events
+    Keeps per-element text buffers so nested captures (e.g. an <a> inside
+    an <h1>) each see their own text
+    """
+
+    def __init__(self):
+        self.index = DocumentIndex()
+        self._text = []
+        self._visible_text = []
+        self._excluded_depth = 0
+        self._open = []
+        self._captures = []
+        self._items = []
+
+    def start(self, name, attrs):
+        index = self.index
+        index.tag_counts[name] += 1
+        record = None
+
+        if name in EXCLUDED_TEXT_TAGS:
+            self._excluded_depth += 1
+
+        if name == 'html':
+            if index.language is None and attrs.get('lang'):
+                index.language = attrs['lang'].strip() or None
+        elif name == 'meta':
+            content = attrs.get('content')
+            if 'name' in attrs:
+                index.meta_by_name.setdefault(attrs['name'], content)
+            if 'property' in attrs:
+                index.meta_by_property.setdefault(attrs['property'], content)
+        elif name == 'img':
+            index.images.append({'src': attrs.get('src'), 'alt': attrs.get('alt')})
+        elif name == 'a' and 'href' in attrs:
+            record = {'href': attrs['href'], 'text': [], 'rel': attrs.get('rel') or []}
+            index.anchors.append(record)
+        elif name in TEXT_CAPTURE_TAGS and name != 'a':
+            record = {'text': []}
+        elif name == 'script' and attrs.get('type') == 'application/ld+json':
+            record = {'raw': []}
+
+        if record is not None and 'text' in record:
+            self._captures.append(record['text'])
+
+        item_record = None
+        if 'itemscope' in attrs or 'typeof' in attrs or (self._items and (
+                'itemprop' in attrs or 'property' in attrs)):
+            item_record = self._start_item(name, attrs)
+        self._open.append((name, record, item_record))
+
+    def _start_item(self, name, attrs):
+        """Open a microdata/RDFa item or property; returns what end() must close"""
+        # Prefixed or absolute names (schema:name, https://schema.org/name) become 'name'
+        names = [
+            prop.rsplit('/', 1)[-1].rsplit(':', 1)[-1]
+            for prop in (attrs.get('itemprop') or attrs.get('property') or '').split()
+        ]
+        parent = self._items[-1] if self._items else None
+
+        if 'itemscope' in attrs or 'typeof' in attrs:
+            types = attrs.get('itemtype') if 'itemscope' in attrs else attrs.get('typeof')
+            item = {'@type': (types or '').split()}
+            if parent is not None and names:
+                add_item_property(parent, names, item)
+            elif 'itemscope' in attrs:
+                self.index.microdata.append(item)
+            else:
+                self.index.rdfa.append(item)
+            self._items.append(item)
+            return {'item': item}
+
+        if not names:
+            return None
+        value = attrs.get('content')
+        if value is None and name in PROPERTY_VALUE_ATTRS:
+            value = attrs.get(PROPERTY_VALUE_ATTRS[name])
+        if value is not None:
+            add_item_property(parent, names, value)
+            return None
+
+        # Otherwise the value is the element's text, known at its end tag
+        capture = []
+        self._captures.append(capture)
+        return {'parent': parent, 'names': names, 'text': capture}
+
+    def data(self, text, is_text=True):
+        """Add a string; is_text is False for script/style bodies"""
+        if is_text:
+            self._text.append(text)
+            stripped = text.strip()
+            if stripped:
+                if not self._excluded_depth:
+                    self._visible_text.append(stripped)
+                for capture in self._captures:
+                    capture.append(stripped)
+        elif self._open:
+            record = self._open[-1][1]
+            if record is not None and 'raw' in record:
+                record['raw'].append(text)
+
+    def end(self):
+        name, record, item_record = self._open.pop()
+        if name in EXCLUDED_TEXT_TAGS:
+            self._excluded_depth -= 1
+        if item_record is not None:
+            if 'item' in item_record:
+                self._items.pop()
+            else:
+                self._captures.pop()
+                add_item_property(item_record['parent'], item_record['names'], ' '.join(item_record['text']))
+        if record is None:
+            return
+
+        index = self.index
+        if 'raw' in record:
+            index.json_ld.append(''.join(record['raw']))
+            return
+
+        self._captures.pop()
+        record['text'] = ''.join(record['text'])
+        if name == 'title':
+            if index.title is None:
+                index.title = record['text']
+        elif name in index.headings:
+            index.headings[name].append(record['text'])
+
+    def finish(self):
+        self.index.text = ''.join(self._text)
+        self.index.visible_text = ' '.join(self._visible_text)
+        return self.index
+
+
+def add_item_property(item, names, value):
+    """Set a property on a microdata/RDFa item, collecting repeated values in a list"""
+    for name in names:
+        if name not in item:
+            item[name] = value
+        elif isinstance(item[name], list):
+            item[name].append(value)
+        else:
+            item[name] = [item[name], value]
+
+
+def _walk_soup(soup, builder):
+    """Feed a BeautifulSoup tree to the builder in document order"""
+    stack = [iter(soup.contents)]
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()
+            if stack:
+                # Every iterator but the root one belongs to an open element
+                builder.end()
+            continue
+
+        if isinstance(node, Tag):
+            builder.start(node.name, node.attrs)
+            stack.append(iter(node.contents))
+        elif isinstance(node, NavigableString):
+            builder.data(str(node), type(node) in TEXT_STRING_TYPES)
+
+
+def collapse_whitespace(text):
+    """Collapse a whitespace-only string the way BeautifulSoup does"""
+    if text.strip(ASCII_SPACES):
+        return text
+    return '\n' if '\n' in text else ' '
+
+
+def _walk_lxml(root, builder):
+    """Feed a native lxml tree to the builder, matching _walk_soup's strings"""
+    non_text_depth = 0
+    preserve_depth = 0
+
+    def emit(text):
+        if text:
+            if not preserve_depth:
+                text = collapse_whitespace(text)
+            builder.data(text, not non_text_depth)
+
+    for event, element in etree.iterwalk(root, events=('start', 'end', 'comment', 'pi')):
+        tag = element.tag
+        if not isinstance(tag, str):
+            # Comments and processing instructions only contribute their tail
+            emit(element.tail)
+            continue
+
+        if event == 'start':
+            attrs = dict(element.attrib)
+            if 'rel' in attrs:
+                attrs['rel'] = attrs['rel'].split()
+            builder.start(tag, attrs)
+            if tag in NON_TEXT_CONTAINERS:
+                non_text_depth += 1
+            if tag in PRESERVE_WHITESPACE_TAGS:
+                preserve_depth += 1
+            emit(element.text)
+        else:
+            if tag in NON_TEXT_CONTAINERS:
+                non_text_depth -= 1
+            if tag in PRESERVE_WHITESPACE_TAGS:
+                preserve_depth -= 1
+            builder.end()
+            if element is not root:
+                emit(element.tail)
+
+
+def build_document_index(document):
+    """
+    Index a parsed page in a single traversal
+    Accepts a BeautifulSoup tree or a native lxml tree
+    """
+    builder = IndexBuilder()
+    if isinstance(document, Tag):
+        _walk_soup(document, builder)
+    else:
+        _walk_lxml(document, builder)
+    return builder.finish()
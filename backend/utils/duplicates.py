@@ -0,0 +1,156 @@
+import hashlib
+import re
+from collections import defaultdict
+from functools import lru_cache
+import numpy as np
+from config import Config
+
+WORD_PATTERN = re.compile(r'[^\W_]+')
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+
+# Odd 64-bit constants for combining token hashes into shingle hashes,
+# and the splitmix64 finalizer that spreads the result over all bits
+SHINGLE_MULTIPLIERS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9)
+MIX_MULTIPLIERS = (0xBF58476D1CE4E5B9, 0x94D049BB133111EB)
+
+
+@lru_cache(maxsize=100000)
+def token_hash(token):
+    """Stable 64-bit hash of a token, the same in every process"""
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def mix64(values):
+    """splitmix64 finalizer over a uint64 array"""
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(MIX_MULTIPLIERS[0])
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(MIX_MULTIPLIERS[1])
+    return values ^ (values >> np.uint64(31))
+
+
+def simhash(text, shingle_size=SHINGLE_SIZE, min_words=None):
+    """
+    64-bit SimHash of a text's word shingles, or None when it is too short
+    Each token is hashed once; shingle hashes are combined from token
+    hashes and the bit votes are counted with NumPy
+    """
+    min_words = Config.DUPLICATE_MIN_WORDS if min_words is None else min_words
+    tokens = WORD_PATTERN.findall(text.lower())
+    if len(tokens) < max(min_words, shingle_size, 1):
+        return None
+
+    hashes = np.fromiter((token_hash(token) for token in tokens), dtype=np.uint64, count=len(tokens))
+    with np.errstate(over='ignore'):
+        shingles = np.zeros(len(tokens) - shingle_size + 1, dtype=np.uint64)
+        for offset in range(shingle_size):
+            multiplier = np.uint64(SHINGLE_MULTIPLIERS[offset % len(SHINGLE_MULTIPLIERS)])
+            shingles += hashes[offset:len(hashes) - shingle_size + 1 + offset] * multiplier
+        shingles = mix64(shingles)
+
+    # A bit is set when most shingles have it set
+    bits = np.unpackbits(shingles.view(np.uint8)).reshape(-1, FINGERPRINT_BITS)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 > len(shingles)
+    return int(np.packbits(votes).view(np.uint64)[0])
+
+
+def hamming_distance(a, b):
+    return (a ^ b).bit_count()
+
+
+def similarity(a, b):
+    """Share of matching fingerprint bits, from 0 to 1"""
+    return 1 - hamming_distance(a, b) / FINGERPRINT_BITS
+
+
+class DuplicateIndex:
+    """
+    Near-duplicate detection over SimHash fingerprints
+    Fingerprints are split into max_distance + 1 bands. Two fingerprints
+    within max_distance bits of each other must agree on at least one
+    whole band, so only pages sharing a band bucket are ever compared
+    instead of every pair. Pages with identical fingerprints are grouped
+    without comparing them at all. Matches are merged into clusters with
+    a union-find as pages are added.
+    """
+
+    def __init__(self, max_distance=None):
+        self.max_distance = Config.DUPLICATE_MAX_DISTANCE if max_distance is None else max_distance
+        band_count = self.max_distance + 1
+        self.band_bits = FINGERPRINT_BITS // band_count
+        self.band_mask = (1 << self.band_bits) - 1
+        self.band_shifts = [band * self.band_bits for band in range(band_count)]
+
+        self.buckets = [defaultdict(list) for _ in self.band_shifts]
+        self.first_doc = {}  # fingerprint -> first document seen with it
+        self.pairs = []  # (doc_a, doc_b, similarity)
+        self.parent = {}
+
+    def __len__(self):
+        return len(self.parent)
+
+    def add(self, doc_id, text):
+        """Fingerprint a page's text and index it; returns the fingerprint"""
+        fingerprint = simhash(text)
+        if fingerprint is not None:
+            self.add_fingerprint(doc_id, fingerprint)
+        return fingerprint
+
+    def add_fingerprint(self, doc_id, fingerprint):
+        """Index a page by its fingerprint, linking it to any near-duplicates already seen"""
+        self.parent.setdefault(doc_id, doc_id)
+
+        original = self.first_doc.get(fingerprint)
+        if original is not None:
+            self.link(original, doc_id, 1.0)
+            return
+        self.first_doc[fingerprint] = doc_id
+
+        candidates = set()
+        for shift, buckets in zip(self.band_shifts, self.buckets):
+            bucket = buckets[(fingerprint >> shift) & self.band_mask]
+            candidates.update(bucket)
+            bucket.append(fingerprint)
+
+        for candidate in candidates:
+            if hamming_distance(fingerprint, candidate) <= self.max_distance:
+                self.link(self.first_doc[candidate], doc_id, similarity(fingerprint, candidate))
+
+    def find(self, doc_id):
+        root = doc_id
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Path compression
+        while self.parent[doc_id] != root:
+            self.parent[doc_id], doc_id = root, self.parent[doc_id]
+        return root
+
+    def link(self, doc_a, doc_b, score):
+        self.pairs.append((doc_a, doc_b, round(score, 4)))
+        root_a, root_b = self.find(doc_a), self.find(doc_b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+    def clusters(self):
+        """Groups of near-duplicate pages, largest first, with the matching pairs behind them"""
+        members = defaultdict(list)
+        for doc_id in self.parent:
+            members[self.find(doc_id)].append(doc_id)
+
+        pairs = defaultdict(list)
+        for doc_a, doc_b, score in self.pairs:
+            pairs[self.find(doc_a)].append({'url1': doc_a, 'url2': doc_b, 'similarity': score})
+
+        clusters = [
+            {
+                'urls': sorted(docs),
+                'size': len(docs),
+                'min_similarity': min(pair['similarity'] for pair in pairs[root]),
+                'pairs': pairs[root]
+            }
+            for root, docs in members.items()
+            if len(docs) > 1
+        ]
+        clusters.sort(key=lambda cluster: (-cluster['size'], cluster['urls'][0]))
+        return clusters
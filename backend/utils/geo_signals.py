@@ -0,0 +1,59 @@
+import re
+from collections import defaultdict
+
+# Every geo signal in one alternation, scanned over the page text once.
+# Earlier alternatives win where matches would overlap (an email is never
+# also read as a phone number or an address word). Case-insensitive parts
+# are scoped with (?i:...) so place names can still require capitals.
+SIGNAL_PATTERNS = [
+    ('email', r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b'),
+    ('phone', r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b|\(\d{3}\)\s*\d{3}[-.]?\d{4}\b'),
+    ('address', r'\b(?i:street|st|avenue|ave|road|rd|suite|floor|building)\b'),
+    ('near_me', r'\b(?i:near me)\b'),
+    ('nearby', r'\b(?i:nearby)\b'),
+    ('local', r'\b(?i:local)\b'),
+    # Only "in " is consumed, so the place can still match as a region
+    ('locality', r'\b[Ii]n (?=(?P<place>[A-Z][a-z]+(?: [A-Z][a-z]+)?)\b)'),
+    ('region', r'\b[A-Z][a-z]+(?: [A-Z][a-z]+)? (?i:city|town|area|region|county)\b'),
+]
+
+GEO_SIGNAL_PATTERN = re.compile('|'.join(
+    f'(?P<{kind}>{pattern})' for kind, pattern in SIGNAL_PATTERNS
+))
+
+# Signals that count as local keywords, with the label reported for each
+LOCAL_KEYWORDS = {
+    'near_me': 'near me',
+    'local': 'local',
+    'nearby': 'nearby',
+    'locality': 'in [City]',
+    'region': '[City] city/town/area',
+}
+
+
+class GeoSignals:
+    """Positions and values of every geo signal found in a text"""
+
+    def __init__(self, matches):
+        self.matches = matches  # kind -> [(position, value)]
+
+    def count(self, kind):
+        return len(self.matches.get(kind, ()))
+
+    def values(self, kind, limit=None):
+        """Distinct matched values of a kind, in order of appearance"""
+        values = list(dict.fromkeys(value for _, value in self.matches.get(kind, ())))
+        return values[:limit] if limit is not None else values
+
+    def positions(self, kind):
+        return [position for position, _ in self.matches.get(kind, ())]
+
+
+def scan_geo_signals(text):
+    """Find phone numbers, emails, address words and local keywords in one pass"""
+    matches = defaultdict(list)
+    for match in GEO_SIGNAL_PATTERN.finditer(text):
+        kind = match.lastgroup
+        value = match.group('place') if kind == 'locality' else match.group()
+        matches[kind].append((match.start(), value))
+    return GeoSignals(dict(matches))
@@ -1,23 +1,173 @@
+import codecs
+import time
+import charset_normalizer
 import requests
-from urllib.parse import urlparse, urljoin
-from bs4 import BeautifulSoup
-import re
+from backend.utils.http_client import http_get
+from backend.utils.cache import CacheEntry, page_cache
+from config import Config
+from datetime import timedelta
+from urllib.parse import urlparse, urljoin, urlunparse
+from backend.utils.parsers import get_parser_backend
+from backend.utils.keywords import extract_keywords
 
-def fetch_url(url, timeout=30):
-    """Fetch URL content with proper headers"""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+class PageResponse:
+    """Fetched page body plus the response details the analyzers use"""
+    
+    def __init__(self, url, status_code, headers, content, encoding, elapsed,
+                 cache_status='miss', text=None, truncated=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+        self.elapsed = elapsed
+        self.cache_status = cache_status
+        self.truncated = truncated
+        self._text = text
+    
+    @property
+    def text(self):
+        """Page body decoded with the response charset"""
+        if self._text is None:
+            self._text = self.content.decode(self.encoding or 'utf-8', errors='replace')
+        return self._text
+    
+    @classmethod
+    def from_cache_entry(cls, entry, elapsed, cache_status):
+        return cls(entry.final_url, entry.status_code, entry.headers, entry.content,
+                   entry.encoding, elapsed, cache_status=cache_status,
+                   truncated=entry.truncated)
+
+def is_html_content_type(content_type):
+    """Check a Content-Type header against the types we can analyze"""
+    if not content_type:
+        return True  # Servers often omit it; let the parser decide
+    media_type = content_type.split(';', 1)[0].strip().lower()
+    return media_type in Config.ALLOWED_CONTENT_TYPES
+
+def get_incremental_decoder(encoding):
+    """Create a streaming decoder for a charset, falling back to UTF-8"""
+    try:
+        return codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+    except LookupError:
+        return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+def read_limited_body(response, max_bytes, timeout):
+    """
+    Stream a response body until it ends, hits max_bytes or runs past timeout
+    Returns (content, text, encoding, truncated), decoding chunks as they arrive
+    """
+    chunks = []
+    text_parts = []
+    received = 0
+    truncated = False
+    encoding = response.encoding
+    decoder = None
+    deadline = time.monotonic() + timeout
+    
+    try:
+        for chunk in response.iter_content(chunk_size=Config.FETCH_CHUNK_SIZE):
+            if not chunk:
+                continue
+            
+            if decoder is None:
+                # Without a declared charset, sniff it from the first chunk
+                if not encoding:
+                    match = charset_normalizer.from_bytes(chunk).best()
+                    encoding = match.encoding if match else 'utf-8'
+                decoder = get_incremental_decoder(encoding)
+            
+            # Only a byte past the cap means the body is longer; one of
+            # exactly max_bytes keeps reading until the stream ends
+            remaining = max_bytes - received
+            if len(chunk) > remaining:
+                chunk = chunk[:remaining]
+                truncated = True
+            
+            chunks.append(chunk)
+            text_parts.append(decoder.decode(chunk))
+            received += len(chunk)
+            
+            if truncated or time.monotonic() > deadline:
+                truncated = True
+                break
+    finally:
+        response.close()
+    
+    if decoder is not None:
+        text_parts.append(decoder.decode(b'', final=True))
+    
+    return b''.join(chunks), ''.join(text_parts), encoding, truncated
+
+def fetch_url(url, timeout=30, use_cache=True):
+    """
+    Fetch URL content through the shared connection pool
+    Pages are served from the page cache while fresh and revalidated
+    with the origin once their TTL expires. The body is streamed and cut
+    off at Config.MAX_CONTENT_LENGTH, marking the page as truncated
+    """
+    cache = page_cache if use_cache else None
+    entry = cache.get(url) if cache else None
+    
+    if entry and entry.is_fresh(cache.ttl):
+        cache.record('hits')
+        # Report the original download time; cache_status marks the hit
+        return PageResponse.from_cache_entry(entry, entry.elapsed or timedelta(0), 'hit')
+    
+    headers = entry.conditional_headers() if entry and entry.can_revalidate() else {}
+    
     try:
-        response = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True)
-        response.raise_for_status()
-        return response
+        response = http_get(url, headers=headers, timeout=timeout, allow_redirects=True, stream=True)
+        
+        if entry and response.status_code == 304:
+            response.close()
+            cache.refresh(entry)
+            cache.record('revalidated')
+            return PageResponse.from_cache_entry(entry, response.elapsed, 'revalidated')
+        
+        if not response.ok:
+            # Streamed responses hold their pooled connection until closed
+            response.close()
+            response.raise_for_status()
+        
+        content_type = response.headers.get('Content-Type')
+        if not is_html_content_type(content_type):
+            response.close()
+            raise Exception(f"Unsupported content type: {content_type}")
+        
+        content, text, encoding, truncated = read_limited_body(
+            response, Config.MAX_CONTENT_LENGTH, timeout
+        )
     except requests.RequestException as e:
         raise Exception(f"Failed to fetch URL: {str(e)}")
+    
+    page = PageResponse(
+        response.url,
+        response.status_code,
+        response.headers,
+        content,
+        encoding,
+        response.elapsed,
+        text=text,
+        truncated=truncated
+    )
+    
+    if cache:
+        cache.record('misses')
+        if response.status_code == 200:
+            cache.put(CacheEntry(url, page.status_code, page.headers, page.content,
+                                 page.encoding, truncated=truncated, elapsed=page.elapsed,
+                                 final_url=page.url))
+    
+    return page
 
-def parse_html(html_content):
-    """Parse HTML content with BeautifulSoup"""
-    return BeautifulSoup(html_content, 'lxml')
+def parse_html(html_content, backend=None):
+    """
+    Parse HTML content with the configured parser backend
+    Returns a BeautifulSoup tree or a native lxml tree; both can be
+    passed to build_document_index and the analyzers
+    """
+    return get_parser_backend(backend).parse(html_content)
 
 def is_valid_url(url):
     """Validate URL format"""
@@ -33,6 +183,30 @@ def normalize_url(url):
         url = 'https://' + url
     return url
 
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def canonicalize_url(url):
+    """
+    Canonical form of a URL for deduplication
+    Lowercases scheme and host, drops default ports and fragments and
+    gives an empty path a trailing slash
+    """
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or '').lower()
+    if ':' in host:
+        host = f'[{host}]'  # IPv6 literal
+    try:
+        port = parsed.port
+    except ValueError:
+        port = None
+    
+    netloc = host
+    if port and port != DEFAULT_PORTS.get(scheme):
+        netloc = f'{host}:{port}'
+    
+    return urlunparse((scheme, netloc, parsed.path or '/', parsed.params, parsed.query, ''))
+
 def get_domain(url):
     """Extract domain from URL"""
     parsed = urlparse(url)
@@ -43,25 +217,6 @@ def is_internal_link(url, base_domain):
     link_domain = get_domain(url)
     return link_domain == base_domain or link_domain == ''
 
-def extract_keywords(text, top_n=10):
-    """Extract top keywords from text"""
-    # Remove special characters and convert to lowercase
-    text = re.sub(r'[^a-zA-Z0-9\s]', '', text.lower())
-    words = text.split()
-    
-    # Common stop words to exclude
-    stop_words = {'the', 'is', 'at', 'which', 'on', 'a', 'an', 'and', 'or', 'but', 'in', 'with', 'to', 'for', 'of', 'as', 'by', 'from', 'this', 'that', 'be', 'are', 'was', 'were', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can'}
-    
-    # Filter and count
-    word_freq = {}
-    for word in words:
-        if word not in stop_words and len(word) > 3:
-            word_freq[word] = word_freq.get(word, 0) + 1
-    
-    # Sort and return top N
-    sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-    return sorted_words[:top_n]
-
 def calculate_score(value, max_value, weight=1.0):
     """Calculate normalized score (0-10)"""
     if max_value == 0:
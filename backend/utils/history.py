@@ -0,0 +1,313 @@
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urlparse
+from config import Config
+
+try:
+    import orjson
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:  # orjson is optional; the standard encoder stores the same JSON
+    def json_dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+    json_loads = json.loads
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    analyzed_at REAL NOT NULL,
+    overall_score REAL,
+    metadata_score REAL,
+    links_score REAL,
+    content_score REAL,
+    performance_score REAL,
+    status_code INTEGER,
+    issue_count INTEGER,
+    include_performance INTEGER NOT NULL DEFAULT 0,
+    include_geo INTEGER NOT NULL DEFAULT 0,
+    result BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_url_time ON analyses (url, analyzed_at);
+CREATE INDEX IF NOT EXISTS idx_analyses_domain_time ON analyses (domain, analyzed_at);
+CREATE INDEX IF NOT EXISTS idx_analyses_time ON analyses (analyzed_at);
+
+-- Newest analysis of every URL, so per-domain rankings never scan old runs
+CREATE TABLE IF NOT EXISTS latest (
+    url TEXT PRIMARY KEY,
+    domain TEXT NOT NULL,
+    analysis_id INTEGER NOT NULL,
+    analyzed_at REAL NOT NULL,
+    overall_score REAL
+);
+CREATE INDEX IF NOT EXISTS idx_latest_domain_score ON latest (domain, overall_score);
+"""
+
+INSERT_ANALYSIS = """
+INSERT INTO analyses (
+    url, domain, analyzed_at, overall_score, metadata_score, links_score,
+    content_score, performance_score, status_code, issue_count,
+    include_performance, include_geo, result
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+UPSERT_LATEST = """
+INSERT INTO latest (url, domain, analysis_id, analyzed_at, overall_score)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (url) DO UPDATE SET
+    domain = excluded.domain,
+    analysis_id = excluded.analysis_id,
+    analyzed_at = excluded.analyzed_at,
+    overall_score = excluded.overall_score
+WHERE excluded.analyzed_at >= latest.analyzed_at
+"""
+
+SUMMARY_COLUMNS = (
+    'id, url, analyzed_at, overall_score, metadata_score, links_score, '
+    'content_score, performance_score, status_code, issue_count'
+)
+
+_STOP = object()
+
+
+def url_domain(url):
+    """Lowercase host[:port] of a URL, or the value itself for a bare domain"""
+    if '//' not in url:
+        url = '//' + url
+    return urlparse(url).netloc.lower()
+
+
+def summary_row(row):
+    return {
+        'id': row['id'],
+        'url': row['url'],
+        'analyzed_at': row['analyzed_at'],
+        'overall_score': row['overall_score'],
+        'scores': {
+            'metadata': row['metadata_score'],
+            'links': row['links_score'],
+            'content': row['content_score'],
+            'performance': row['performance_score']
+        },
+        'status_code': row['status_code'],
+        'issue_count': row['issue_count']
+    }
+
+
+class HistoryStore:
+    """
+    SQLite store of past analysis results
+    Results are queued by the request threads and written by one background
+    thread, many per transaction, so recording never waits on the disk.
+    The database runs in WAL mode: readers are never blocked by the writer,
+    and several processes (e.g. gunicorn workers) can share one file.
+    """
+
+    def __init__(self, path, batch_size=None, queue_size=None):
+        self.path = path
+        self.batch_size = batch_size or Config.HISTORY_BATCH_SIZE
+        self._queue = queue.Queue(maxsize=queue_size or Config.HISTORY_QUEUE_SIZE)
+        self._local = threading.local()
+        self._writer = None
+        self._lock = threading.Lock()
+        self._stats = {'written': 0, 'dropped': 0, 'failed': 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self.connect()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=Config.HISTORY_BUSY_TIMEOUT)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')  # Durable at checkpoints; safe with WAL
+        return conn
+
+    def _reader(self):
+        """Connection for the calling thread, opened on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self.connect()
+        return conn
+
+    def record(self, result, include_performance=False, include_geo=False):
+        """Queue a successful analysis result to be written; never blocks"""
+        if not result or not result.get('success'):
+            return
+        self._start_writer()
+        try:
+            self._queue.put_nowait((time.time(), result, include_performance, include_geo))
+        except queue.Full:
+            with self._lock:
+                self._stats['dropped'] += 1
+
+    def _start_writer(self):
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._run, name='history-writer', daemon=True)
+                    self._writer.start()
+
+    def _run(self):
+        conn = self.connect()
+        while True:
+            # Block for one result, then take whatever else queued up meanwhile
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = _STOP in batch
+            items = [item for item in batch if item is not _STOP]
+            if items:
+                self._write(conn, items)
+            if stop:
+                conn.close()
+                return
+
+    def _write(self, conn, items):
+        try:
+            with conn:
+                for analyzed_at, result, include_performance, include_geo in items:
+                    self._insert(conn, analyzed_at, result, include_performance, include_geo)
+            with self._lock:
+                self._stats['written'] += len(items)
+        except Exception as e:
+            print(f"Failed to write analysis history: {str(e)}")
+            with self._lock:
+                self._stats['failed'] += len(items)
+
+    def _insert(self, conn, analyzed_at, result, include_performance, include_geo):
+        url = result['url']
+        domain = url_domain(url)
+        scores = result.get('scores') or {}
+        cursor = conn.execute(INSERT_ANALYSIS, (
+            url,
+            domain,
+            analyzed_at,
+            result.get('overall_score'),
+            scores.get('metadata'),
+            scores.get('links'),
+            scores.get('content'),
+            scores.get('performance'),
+            result.get('status_code'),
+            len(result.get('issues') or []),
+            int(bool(include_performance)),
+            int(bool(include_geo)),
+            zlib.compress(json_dumps(result))
+        ))
+        conn.execute(UPSERT_LATEST, (url, domain, cursor.lastrowid, analyzed_at, result.get('overall_score')))
+
+    def flush(self, timeout=None):
+        """Write everything queued so far and stop the writer thread"""
+        if self._writer is None:
+            return
+        self._queue.put(_STOP)
+        self._writer.join(timeout)
+        self._writer = None
+
+    def latest(self, url, max_age=None, include_performance=False, include_geo=False):
+        """
+        Newest stored result for a URL, or None
+        With max_age (seconds) only a result at least that recent counts, and
+        it must include performance/GEO data when those are asked for
+        """
+        since = time.time() - max_age if max_age is not None else 0
+        row = self._reader().execute(
+            'SELECT analyzed_at, result FROM analyses '
+            'WHERE url = ? AND analyzed_at >= ? AND include_performance >= ? AND include_geo >= ? '
+            'ORDER BY analyzed_at DESC LIMIT 1',
+            (url, since, int(bool(include_performance)), int(bool(include_geo)))
+        ).fetchone()
+        if row is None:
+            return None
+        result = json_loads(zlib.decompress(row['result']))
+        result['analyzed_at'] = row['analyzed_at']
+        return result
+
+    def history(self, url, limit=50):
+        """Score history of a URL, newest first"""
+        rows = self._reader().execute(
+            f'SELECT {SUMMARY_COLUMNS} FROM analyses WHERE url = ? '
+            'ORDER BY analyzed_at DESC LIMIT ?',
+            (url, limit)
+        )
+        return [summary_row(row) for row in rows]
+
+    def worst_pages(self, domain, limit=20):
+        """Pages of a domain with the lowest score in their latest analysis"""
+        rows = self._reader().execute(
+            f'SELECT {", ".join("a." + column for column in SUMMARY_COLUMNS.split(", "))} '
+            'FROM latest l JOIN analyses a ON a.id = l.analysis_id '
+            'WHERE l.domain = ? AND l.overall_score IS NOT NULL '
+            'ORDER BY l.overall_score ASC LIMIT ?',
+            (url_domain(domain), limit)
+        )
+        return [summary_row(row) for row in rows]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['queued'] = self._queue.qsize()
+        return stats
+
+
+_history_store = None
+_history_store_error = None
+_history_store_lock = threading.Lock()
+
+
+def get_history_store():
+    """
+    Get the process-wide history store, or None when history is disabled
+    or the database cannot be opened (e.g. on a read-only filesystem).
+    A failed open is logged once and not retried.
+    """
+    global _history_store, _history_store_error
+    if not Config.HISTORY_ENABLED or _history_store_error is not None:
+        return None
+    if _history_store is None:
+        with _history_store_lock:
+            if _history_store is None and _history_store_error is None:
+                try:
+                    _history_store = HistoryStore(Config.HISTORY_DB_PATH)
+                except Exception as e:
+                    print(f"Analysis history unavailable ({Config.HISTORY_DB_PATH}): {str(e)}")
+                    _history_store_error = str(e)
+                    return None
+                atexit.register(_history_store.flush, Config.HISTORY_FLUSH_TIMEOUT)
+    return _history_store
+
+
+def history_stats():
+    """History stats for health checks: None when disabled, an error when unavailable"""
+    if not Config.HISTORY_ENABLED:
+        return None
+    store = get_history_store()
+    if store is None:
+        return {'error': _history_store_error}
+    return store.stats()
+
+
+def record_analysis(result, include_performance=False, include_geo=False):
+    """Store a result in the history, if enabled; failures never reach the caller"""
+    try:
+        store = get_history_store()
+        if store is not None:
+            store.record(result, include_performance, include_geo)
+    except Exception as e:
+        print(f"Failed to record analysis history: {str(e)}")
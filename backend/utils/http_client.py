@@ -0,0 +1,63 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from urllib3.util.request import ACCEPT_ENCODING
+from config import Config
+
+# Idempotent methods that are safe to retry
+RETRY_METHODS = frozenset(['GET', 'HEAD'])
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+def create_session(max_retries=None, pool_maxsize=None, retry_status_codes=RETRY_STATUS_CODES):
+    """
+    Create a requests session with pooled keep-alive connections
+    Connections are pooled per host, sized from Config unless overridden
+    """
+    retry = Retry(
+        total=Config.HTTP_MAX_RETRIES if max_retries is None else max_retries,
+        read=False,  # A read timeout already used the caller's whole timeout; raise it, never repeat it
+        backoff_factor=Config.HTTP_BACKOFF_FACTOR,
+        status_forcelist=retry_status_codes,
+        allowed_methods=RETRY_METHODS,
+        raise_on_status=False,
+        # Retry-After is set by the (user-chosen) server and urllib3 sleeps it
+        # uncapped, so only our own short backoff is used
+        respect_retry_after_header=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=Config.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize or Config.HTTP_POOL_MAXSIZE,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'User-Agent': Config.USER_AGENT,
+        # Includes br when a brotli decoder is installed
+        'Accept-Encoding': ACCEPT_ENCODING,
+        'Connection': 'keep-alive'
+    })
+    return session
+
+def get_session():
+    """Get the process-wide shared session"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+def http_get(url, **kwargs):
+    """GET a URL through the shared connection pool"""
+    return get_session().get(url, **kwargs)
+
+def http_head(url, **kwargs):
+    """HEAD a URL through the shared connection pool"""
+    return get_session().head(url, **kwargs)
@@ -0,0 +1,189 @@
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from config import Config
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+class JobQueueFull(Exception):
+    """Raised when no more jobs can be queued"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once it has been cancelled"""
+
+
+class Job:
+    """A unit of background work with its status and results"""
+
+    def __init__(self, kind, func, args):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.func = func
+        self.args = args
+        self.status = QUEUED
+        self.partial = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel_requested = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATES
+
+    @property
+    def cancel_requested(self):
+        return self._cancel_requested.is_set()
+
+    def report_progress(self, section, payload):
+        """
+        Record a partial result while the job runs
+        Also the point where a running job notices it was cancelled
+        """
+        if self.cancel_requested:
+            raise JobCancelled('Job was cancelled')
+        self.partial[section] = payload
+
+    def run(self):
+        if self.cancel_requested:
+            return
+
+        self.status = RUNNING
+        self.started_at = time.time()
+        try:
+            result = self.func(*self.args, on_progress=self.report_progress)
+            if self.cancel_requested:
+                self.status = CANCELLED
+            else:
+                self.result = result
+                self.status = COMPLETED
+        except JobCancelled:
+            self.status = CANCELLED
+        except Exception as e:
+            self.error = str(e)
+            self.status = FAILED
+        finally:
+            self.finished_at = time.time()
+
+    def to_dict(self):
+        data = {
+            'job_id': self.id,
+            'type': self.kind,
+            'status': self.status,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'partial': self.partial
+        }
+        if self.status == COMPLETED:
+            data['result'] = self.result
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+class JobQueue:
+    """
+    Bounded queue of background jobs run by a local pool of worker threads
+    Finished jobs are kept for polling until their TTL runs out
+    """
+
+    def __init__(self, max_workers=None, max_queued=None, ttl=None, max_stored=None):
+        self.max_workers = max_workers or Config.JOB_MAX_WORKERS
+        self.ttl = Config.JOB_TTL if ttl is None else ttl
+        self.max_stored = max_stored or Config.JOB_MAX_STORED
+        self._queue = queue.Queue(maxsize=max_queued or Config.JOB_QUEUE_SIZE)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._workers = []
+
+    def submit(self, kind, func, *args):
+        """Queue func(*args, on_progress=...) and return its Job"""
+        self._start_workers()
+        self.evict_expired()
+
+        job = Job(kind, func, args)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            raise JobQueueFull('Too many jobs queued, try again later')
+
+        with self._lock:
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        self.evict_expired()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a job; queued jobs stop at once, running ones at their next progress report"""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+
+        job._cancel_requested.set()
+        if job.status == QUEUED:
+            job.status = CANCELLED
+            job.finished_at = time.time()
+        return job
+
+    def evict_expired(self):
+        """Drop finished jobs older than the TTL, oldest first past the storage cap"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            finished = [job for job in self._jobs.values() if job.finished]
+            overflow = max(0, len(self._jobs) - self.max_stored)
+            expired = [
+                job.id for i, job in enumerate(finished)
+                if i < overflow or job.finished_at < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+    def stats(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts = {state: 0 for state in (QUEUED, RUNNING) + FINISHED_STATES}
+        for job in jobs:
+            counts[job.status] += 1
+        counts['workers'] = self.max_workers
+        return counts
+
+    def _start_workers(self):
+        if self._workers:
+            return
+        with self._lock:
+            if self._workers:
+                return
+            for i in range(self.max_workers):
+                worker = threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            try:
+                job.run()
+            except Exception as e:
+                print(f"Job {job.id} crashed: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+
+job_queue = JobQueue()
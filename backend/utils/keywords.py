@@ -0,0 +1,105 @@
+import heapq
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from operator import itemgetter
+
+STOP_WORDS_DIR = os.path.join(os.path.dirname(__file__), 'stopwords')
+DEFAULT_LANGUAGE = 'en'
+
+# Words are runs of letters and digits in any script. Phrase-ending
+# punctuation comes out as single-character tokens, which are never
+# long enough to count as words
+TOKEN_PATTERN = re.compile(r'[^\W_]+|[.!?;:,()\[\]{}"“”«»|/\\]')
+
+MIN_KEYWORD_LENGTH = 4  # Shorter words are rarely useful single keywords
+MIN_PHRASE_WORD_LENGTH = 2
+MIN_PHRASE_FREQUENCY = 2  # Phrases seen once are not reported
+DETECTION_SAMPLE = 500  # Tokens used to guess the language of an untagged page
+
+
+def load_stop_words(language):
+    """Stop words for a language code (e.g. 'en', 'de-AT'), read from disk once"""
+    # <html lang> is page-controlled, so only known base codes reach the cache
+    language = (language or DEFAULT_LANGUAGE).split('-')[0].split('_')[0].lower()
+    if language not in available_languages():
+        language = DEFAULT_LANGUAGE
+    return _read_stop_words(language)
+
+
+@lru_cache(maxsize=None)
+def _read_stop_words(language):
+    with open(os.path.join(STOP_WORDS_DIR, f'{language}.txt'), encoding='utf-8') as f:
+        return frozenset(f.read().split())
+
+
+@lru_cache(maxsize=1)
+def available_languages():
+    return tuple(sorted(name[:-4] for name in os.listdir(STOP_WORDS_DIR) if name.endswith('.txt')))
+
+
+def detect_language(tokens):
+    """Guess a page language from which stop-word list its first words hit most"""
+    sample = tokens[:DETECTION_SAMPLE]
+    best, best_hits = DEFAULT_LANGUAGE, 0
+    for language in available_languages():
+        stop_words = load_stop_words(language)
+        hits = sum(token in stop_words for token in sample)
+        if hits > best_hits:
+            best, best_hits = language, hits
+    return best
+
+
+def top_counts(counts, n):
+    """Top n (item, count) pairs by count, first seen first on ties"""
+    return heapq.nlargest(n, counts.items(), key=itemgetter(1))
+
+
+def analyze_keywords(text, top_n=10, top_phrases=10, language=None):
+    """
+    Extract top keywords and two/three-word phrases from text in one tokenizing pass
+    Phrases are runs of non-stop words that do not cross punctuation.
+    The language picks the stop-word list; it is guessed when not given.
+    """
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if not language:
+        language = detect_language(tokens)
+    stop_words = load_stop_words(language)
+
+    # Count every token at C speed, then filter the (much smaller) vocabulary
+    counts = Counter(tokens)
+    words = Counter({
+        word: count for word, count in counts.items()
+        if len(word) >= MIN_KEYWORD_LENGTH and word not in stop_words
+    })
+
+    phrases = Counter()
+    if top_phrases:
+        phrase_words = {
+            word for word in counts
+            if len(word) >= MIN_PHRASE_WORD_LENGTH and word not in stop_words
+        }
+        # Stop words, very short words and punctuation break a phrase
+        marked = [token if token in phrase_words else None for token in tokens]
+        phrases.update(
+            f'{a} {b}' for a, b in zip(marked, marked[1:]) if a and b
+        )
+        phrases.update(
+            f'{a} {b} {c}' for a, b, c in zip(marked, marked[1:], marked[2:]) if a and b and c
+        )
+
+    frequent_phrases = Counter({
+        phrase: count for phrase, count in phrases.items()
+        if count >= MIN_PHRASE_FREQUENCY
+    })
+    return {
+        'language': language,
+        'keywords': top_counts(words, top_n),
+        'phrases': top_counts(frequent_phrases, top_phrases)
+    }
+
+
+def extract_keywords(text, top_n=10, language=None):
+    """Extract top keywords from text as (keyword, frequency) pairs"""
+    return analyze_keywords(text, top_n=top_n, top_phrases=0, language=language)['keywords']
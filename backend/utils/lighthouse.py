@@ -1,34 +1,92 @@
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from backend.utils.cache import DiskCache
+from backend.utils.http_client import create_session
+from backend.utils.rate_limit import TokenBucket
 from config import Config
 
-def run_lighthouse_analysis(url, api_key=None):
+# Shared pool so PageSpeed requests can run while the page is analyzed locally
+_lighthouse_executor = ThreadPoolExecutor(
+    max_workers=Config.PERFORMANCE_MAX_WORKERS,
+    thread_name_prefix='lighthouse'
+)
+
+DEFAULT_CATEGORIES = ['performance', 'accessibility', 'best-practices', 'seo']
+
+# Results are cached on disk so repeated analyses do not spend API quota
+pagespeed_cache = DiskCache(Config.PAGESPEED_CACHE_DIR, Config.PAGESPEED_CACHE_TTL)
+
+# Own session without status retries: a PageSpeed 5xx is a failed audit that
+# would only fail again at the cost of quota, and a 429 must reach the throttle
+pagespeed_session = create_session(retry_status_codes=())
+
+# Client-side throttle that stays under the PageSpeed quota (per worker process)
+pagespeed_limiter = TokenBucket(
+    rate=Config.PAGESPEED_RATE_PER_MINUTE / 60.0,
+    capacity=Config.PAGESPEED_BURST
+)
+
+def run_lighthouse_analysis(url, api_key=None, strategy='desktop', categories=None, cancel=None):
     """
     Run Lighthouse analysis using Google PageSpeed Insights API
-    This is a free API with rate limits
+    This is a free API with rate limits, so results are cached and calls
+    are throttled. The result's data_source is 'fresh', 'cached' or 'mocked'
+    Once the optional `cancel` event is set, no API call is made any more
     """
     api_key = api_key or Config.LIGHTHOUSE_API_KEY
+    categories = categories or DEFAULT_CATEGORIES
+    cache_key = [url, strategy, sorted(categories)]
+    
+    cached = pagespeed_cache.get(cache_key)
+    if cached:
+        cached['data_source'] = 'cached'
+        return cached
+    
+    if cancel is not None and cancel.is_set():
+        return get_mock_performance_data(reason='Analysis cancelled')
+    
+    if not pagespeed_limiter.acquire(timeout=Config.PAGESPEED_QUEUE_TIMEOUT, cancel=cancel):
+        if cancel is not None and cancel.is_set():
+            return get_mock_performance_data(reason='Analysis cancelled')
+        return get_mock_performance_data(reason='Client-side PageSpeed rate limit reached')
     
     params = {
         'url': url,
-        'category': ['performance', 'accessibility', 'best-practices', 'seo'],
-        'strategy': 'desktop'
+        'category': categories,
+        'strategy': strategy
     }
     
     if api_key:
         params['key'] = api_key
     
+    if cancel is not None and cancel.is_set():
+        return get_mock_performance_data(reason='Analysis cancelled')
+    
     try:
-        response = requests.get(Config.PAGESPEED_API_URL, params=params, timeout=60)
+        response = pagespeed_session.get(Config.PAGESPEED_API_URL, params=params, timeout=60)
         
         if response.status_code == 200:
             data = response.json()
-            return parse_lighthouse_data(data)
+            results = parse_lighthouse_data(data)
+            if results['data_source'] == 'fresh':
+                pagespeed_cache.set(cache_key, results)
+            return results
         else:
+            if response.status_code == 429:
+                # Google is already throttling us, so hold back further calls
+                pagespeed_limiter.drain()
             # Return mock data if API fails (for development/free tier limits)
-            return get_mock_performance_data()
+            return get_mock_performance_data(reason=f'PageSpeed API returned HTTP {response.status_code}')
     except Exception as e:
         print(f"Lighthouse API error: {str(e)}")
-        return get_mock_performance_data()
+        return get_mock_performance_data(reason=str(e))
+
+def start_lighthouse_analysis(url, api_key=None, cancel=None):
+    """
+    Start a Lighthouse analysis in the background
+    Returns a Future resolving to the same result as run_lighthouse_analysis;
+    setting `cancel` stops it before it spends an API call
+    """
+    return _lighthouse_executor.submit(run_lighthouse_analysis, url, api_key, cancel=cancel)
 
 def parse_lighthouse_data(data):
     """Parse Lighthouse API response"""
@@ -62,13 +120,14 @@ def parse_lighthouse_data(data):
                 'cumulative_layout_shift': cls,
                 'speed_index': speed_index
             },
-            'overall_score': round((performance_score + seo_score) / 2, 1)
+            'overall_score': round((performance_score + seo_score) / 2, 1),
+            'data_source': 'fresh'
         }
     except Exception as e:
         print(f"Error parsing Lighthouse data: {str(e)}")
-        return get_mock_performance_data()
+        return get_mock_performance_data(reason='Unreadable PageSpeed API response')
 
-def get_mock_performance_data():
+def get_mock_performance_data(reason=None):
     """Return mock performance data for development or when API fails"""
     return {
         'performance_score': 7.5,
@@ -82,6 +141,8 @@ def get_mock_performance_data():
             'cumulative_layout_shift': '0.05',
             'speed_index': '2.1 s'
         },
-        'overall_score': 7.9
+        'overall_score': 7.9,
+        'data_source': 'mocked',
+        'mock_reason': reason
     }
 
@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+import requests
+from backend.utils.http_client import create_session
+from config import Config
+
+# Servers that reject HEAD often answer with one of these; retry with GET
+HEAD_FALLBACK_STATUS_CODES = {403, 404, 405, 501}
+
+
+class LinkChecker:
+    """
+    Checks link targets concurrently, HEAD first with a GET fallback
+    Results are cached per URL so links shared across pages are checked once
+    """
+
+    def __init__(self, max_workers=None, per_host_limit=None, timeout=None, cache_ttl=None, cache_size=None):
+        self.timeout = timeout or Config.LINK_CHECK_TIMEOUT
+        self.per_host_limit = per_host_limit or Config.LINK_CHECK_PER_HOST_LIMIT
+        self.cache_ttl = cache_ttl or Config.LINK_CHECK_CACHE_TTL
+        self.cache_size = cache_size or Config.LINK_CHECK_CACHE_SIZE
+        max_workers = max_workers or Config.LINK_CHECK_MAX_WORKERS
+
+        # Dedicated session: link checks must fail fast instead of retrying
+        self.session = create_session(max_retries=0, pool_maxsize=self.per_host_limit)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='link-check')
+        self._cache = OrderedDict()
+        self._host_semaphores = {}  # host -> [semaphore, checks waiting or running]
+        self._lock = threading.Lock()
+
+    def check_all(self, urls, time_budget=None):
+        """
+        Check many URLs concurrently within a total time budget
+        Returns {url: result}; URLs not finished in time have status 'unchecked'
+        """
+        time_budget = time_budget or Config.LINK_CHECK_TIME_BUDGET
+        results = {}
+        futures = {}
+
+        for url in dict.fromkeys(urls):
+            cached = self._cached(url)
+            if cached is not None:
+                results[url] = cached
+            else:
+                futures[self.executor.submit(self.check_url, url)] = url
+
+        done, not_done = wait(futures, timeout=time_budget)
+        for future in done:
+            results[futures[future]] = future.result()
+        for future in not_done:
+            # Pending checks are dropped; running ones still fill the cache
+            future.cancel()
+            results[futures[future]] = {'status': 'unchecked', 'status_code': None, 'error': 'Time budget exceeded'}
+
+        # Page order, not completion order, so repeated analyses give identical output
+        return {url: results[url] for url in dict.fromkeys(urls)}
+
+    def check_url(self, url):
+        """Check a single URL, using the cache when possible"""
+        cached = self._cached(url)
+        if cached is not None:
+            return cached
+
+        with self._host_slot(url):
+            result = self._request(url)
+
+        with self._lock:
+            self._cache[url] = (time.time(), result)
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def _request(self, url):
+        try:
+            response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+            if response.status_code in HEAD_FALLBACK_STATUS_CODES:
+                response = self.session.get(url, timeout=self.timeout, allow_redirects=True, stream=True)
+                response.close()
+        except requests.RequestException as e:
+            return {'status': 'broken', 'status_code': None, 'error': str(e)}
+
+        status = 'broken' if response.status_code >= 400 else 'ok'
+        return {'status': status, 'status_code': response.status_code, 'error': None}
+
+    def _cached(self, url):
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry is None:
+                return None
+            checked_at, result = entry
+            if time.time() - checked_at >= self.cache_ttl:
+                del self._cache[url]
+                return None
+            return result
+
+    @contextmanager
+    def _host_slot(self, url):
+        """
+        Hold one of a host's per_host_limit slots
+        A host's semaphore only exists while checks against it are in flight,
+        so the process-wide checker does not keep one for every host ever seen
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            entry = self._host_semaphores.get(host)
+            if entry is None:
+                entry = self._host_semaphores[host] = [threading.BoundedSemaphore(self.per_host_limit), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._host_semaphores[host]
+
+
+_link_checker = None
+_link_checker_lock = threading.Lock()
+
+def get_link_checker():
+    """Get the process-wide link checker (shared cache and worker pool)"""
+    global _link_checker
+    if _link_checker is None:
+        with _link_checker_lock:
+            if _link_checker is None:
+                _link_checker = LinkChecker()
+    return _link_checker
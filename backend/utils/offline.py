@@ -0,0 +1,251 @@
+import gzip
+import os
+import zlib
+from datetime import timedelta
+from pathlib import Path
+from urllib.parse import urljoin
+import charset_normalizer
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from backend.utils.helpers import PageResponse, is_html_content_type
+from config import Config
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; br-encoded records are skipped without it
+    brotli = None
+
+HTML_EXTENSIONS = ('.html', '.htm', '.xhtml')
+WARC_EXTENSIONS = ('.warc', '.warc.gz')
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def sniff_encoding(content):
+    """Guess the charset of an undeclared page from its first chunk, like fetch_url"""
+    match = charset_normalizer.from_bytes(content[:Config.FETCH_CHUNK_SIZE]).best()
+    return match.encoding if match else 'utf-8'
+
+
+def make_page(url, content, status_code=200, headers=None):
+    """Wrap an archived or local page body as a PageResponse for SEOAnalyzer"""
+    headers = CaseInsensitiveDict(headers or {})
+    truncated = len(content) > Config.MAX_CONTENT_LENGTH
+    if truncated:
+        content = content[:Config.MAX_CONTENT_LENGTH]
+
+    # Same charset rules as a live fetch through requests
+    encoding = get_encoding_from_headers(headers) if 'Content-Type' in headers else None
+    return PageResponse(
+        url,
+        status_code,
+        headers,
+        content,
+        encoding or sniff_encoding(content),
+        timedelta(0),
+        cache_status='offline',
+        truncated=truncated
+    )
+
+
+def read_html_file(path, url):
+    with open(path, 'rb') as f:
+        return make_page(url, f.read())
+
+
+def iter_html_files(root, base_url=None, exclude=()):
+    """
+    Yield a page for every HTML file under a directory (or a single file)
+    URLs are file:// URIs unless base_url is given, in which case each
+    file's path relative to the root is resolved against it. Files whose
+    URL is in exclude are not read.
+    """
+    root = Path(root)
+    if root.is_file():
+        paths = [root]
+        root = root.parent
+    else:
+        paths = (
+            Path(directory) / name
+            for directory, _, names in os.walk(root)
+            for name in sorted(names)
+            if name.lower().endswith(HTML_EXTENSIONS)
+        )
+
+    for path in paths:
+        if base_url:
+            url = urljoin(base_url, path.relative_to(root).as_posix())
+        else:
+            url = path.resolve().as_uri()
+        if url not in exclude:
+            yield read_html_file(path, url)
+
+
+class WarcReader:
+    """
+    Streaming reader for WARC and WARC.gz archives
+    Records are read one at a time from the (optionally gzipped) stream and
+    only HTML response bodies are kept in memory, so archive size does not
+    matter. Gzipped archives are decompressed on the fly member by member.
+    """
+
+    def __init__(self, path, max_bytes=None, exclude=()):
+        self.path = path
+        self.max_bytes = max_bytes or Config.MAX_CONTENT_LENGTH
+        self.exclude = exclude
+
+    def open(self):
+        stream = open(self.path, 'rb')
+        if stream.read(2) == GZIP_MAGIC:
+            stream.seek(0)
+            return gzip.GzipFile(fileobj=stream)
+        stream.seek(0)
+        return stream
+
+    def __iter__(self):
+        with self.open() as stream:
+            while True:
+                headers = self.read_headers(stream, record=True)
+                if headers is None:
+                    return
+
+                length = int(headers.get('Content-Length', 0))
+                if self.is_html_response(headers):
+                    page = self.read_response(stream, headers, length)
+                    if page is not None:
+                        yield page
+                else:
+                    self.skip(stream, length)
+
+    def read_headers(self, stream, record=False):
+        """Read a block of header lines; for WARC records also the version line"""
+        line = stream.readline()
+        if record:
+            # Records are separated by blank lines
+            while line in (b'\r\n', b'\n'):
+                line = stream.readline()
+            if not line:
+                return None
+            if not line.startswith(b'WARC/'):
+                raise ValueError(f"Not a WARC record in {self.path}: {line[:40]!r}")
+            line = stream.readline()
+
+        headers = CaseInsensitiveDict()
+        while line and line not in (b'\r\n', b'\n'):
+            name, _, value = line.decode('utf-8', 'replace').partition(':')
+            headers[name.strip()] = value.strip()
+            line = stream.readline()
+        return headers
+
+    def is_html_response(self, headers):
+        return (
+            headers.get('WARC-Type') == 'response'
+            and headers.get('Content-Type', '').startswith('application/http')
+            and 'WARC-Target-URI' in headers
+            and headers['WARC-Target-URI'].strip('<>') not in self.exclude
+        )
+
+    def skip(self, stream, length):
+        if stream.seekable():
+            stream.seek(length, os.SEEK_CUR)
+            return
+        while length > 0:
+            chunk = stream.read(min(length, Config.FETCH_CHUNK_SIZE))
+            if not chunk:
+                return
+            length -= len(chunk)
+
+    def read_response(self, stream, warc_headers, length):
+        """Parse the HTTP response stored in a record; None if it is not an HTML page"""
+        start = stream.tell()
+        status_line = stream.readline()
+        http_headers = self.read_headers(stream)
+        body_length = length - (stream.tell() - start)
+
+        parts = status_line.split(None, 2)
+        status_code = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+        if not is_html_content_type(http_headers.get('Content-Type')) or not 200 <= status_code < 300:
+            self.skip(stream, body_length)
+            return None
+
+        # Keep what we analyze, plus enough to detect a truncated body
+        body = stream.read(min(body_length, self.max_bytes + 1))
+        self.skip(stream, body_length - len(body))
+
+        try:
+            body = decode_body(body, http_headers)
+        except Exception as e:
+            print(f"Skipping {warc_headers['WARC-Target-URI']}: {str(e)}")
+            return None
+
+        url = warc_headers['WARC-Target-URI'].strip('<>')
+        return make_page(url, body, status_code=status_code, headers=http_headers)
+
+
+def decode_body(body, headers):
+    """Undo the transfer and content encodings an archived HTTP body may still carry"""
+    if 'chunked' in headers.get('Transfer-Encoding', '').lower():
+        body = dechunk(body)
+
+    # Never inflate past what make_page keeps
+    limit = Config.MAX_CONTENT_LENGTH + 1
+    encoding = headers.get('Content-Encoding', '').strip().lower()
+    if encoding in ('gzip', 'x-gzip', 'deflate'):
+        # Archives may hold truncated bodies; keep whatever decompresses.
+        # The window bits accept gzip and zlib headers; bare deflate is retried raw
+        try:
+            body = zlib.decompressobj(zlib.MAX_WBITS | 32).decompress(body, limit)
+        except zlib.error:
+            if encoding != 'deflate':
+                raise
+            body = zlib.decompressobj(-zlib.MAX_WBITS).decompress(body, limit)
+    elif encoding == 'br':
+        if brotli is None:
+            raise Exception('Brotli-encoded body and no brotli decoder installed')
+        body = brotli.decompress(body)
+    return body
+
+
+def dechunk(body):
+    """Join an HTTP/1.1 chunked body, tolerating a truncated final chunk"""
+    chunks = []
+    position = 0
+    while position < len(body):
+        line_end = body.find(b'\r\n', position)
+        if line_end == -1:
+            break
+        size = int(body[position:line_end].split(b';')[0] or b'0', 16)
+        if size == 0:
+            break
+        start = line_end + 2
+        chunks.append(body[start:start + size])
+        position = start + size + 2
+    return b''.join(chunks)
+
+
+def is_warc_file(path):
+    return str(path).lower().endswith(WARC_EXTENSIONS)
+
+
+def iter_offline_pages(source, base_url=None, exclude=()):
+    """
+    Yield pages from local HTML files, directories and WARC archives
+    Directories are walked for both HTML files and archives. Pages whose
+    URL is in exclude (e.g. already analyzed) are skipped without reading
+    their bodies.
+    """
+    source = Path(source)
+    if source.is_file():
+        if is_warc_file(source):
+            yield from WarcReader(source, exclude=exclude)
+        else:
+            yield from iter_html_files(source, base_url=base_url, exclude=exclude)
+        return
+
+    if not source.is_dir():
+        raise Exception(f"No such file or directory: {source}")
+
+    yield from iter_html_files(source, base_url=base_url, exclude=exclude)
+    for directory, _, names in os.walk(source):
+        for name in sorted(names):
+            if is_warc_file(name):
+                yield from WarcReader(Path(directory) / name, exclude=exclude)
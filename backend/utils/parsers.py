@@ -0,0 +1,46 @@
+import re
+from bs4 import BeautifulSoup
+from lxml import etree
+import lxml.html
+from config import Config
+
+# lxml refuses str input that still carries an XML encoding declaration
+XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+
+class BeautifulSoupBackend:
+    """Compatibility backend: BeautifulSoup tree built on top of lxml"""
+
+    name = 'beautifulsoup'
+
+    def parse(self, html_content):
+        return BeautifulSoup(html_content, 'lxml')
+
+
+class LxmlBackend:
+    """Fast backend: native lxml.html tree, no BeautifulSoup wrapper objects"""
+
+    name = 'lxml'
+
+    def parse(self, html_content):
+        if isinstance(html_content, str):
+            html_content = XML_DECLARATION.sub('', html_content, count=1)
+        try:
+            return lxml.html.document_fromstring(html_content)
+        except etree.ParserError:
+            # Empty or whitespace-only documents
+            return lxml.html.document_fromstring('<html></html>')
+
+
+PARSER_BACKENDS = {
+    BeautifulSoupBackend.name: BeautifulSoupBackend(),
+    LxmlBackend.name: LxmlBackend()
+}
+
+def get_parser_backend(name=None):
+    """Get a parser backend by name, defaulting to Config.HTML_PARSER_BACKEND"""
+    name = name or Config.HTML_PARSER_BACKEND
+    try:
+        return PARSER_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown HTML parser backend: {name}")
@@ -0,0 +1,49 @@
+import threading
+import time
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter
+    Tokens refill continuously at `rate` per second up to `capacity`
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout=0, cancel=None):
+        """
+        Take one token, waiting up to `timeout` seconds for a refill
+        Returns False if no token became available in time, or once the
+        optional `cancel` event is set
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if cancel is None:
+                time.sleep(min(wait, remaining))
+            elif cancel.wait(min(wait, remaining)):
+                return False
+
+    def drain(self):
+        """Empty the bucket, e.g. after the upstream API reports throttling"""
+        with self._lock:
+            self._refill()
+            self._tokens = 0
@@ -0,0 +1,78 @@
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from config import Config
+
+# Words (letters with inner apostrophes) and sentence-ending punctuation
+# followed by whitespace, so decimals and URLs do not end sentences
+TOKEN_PATTERN = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*|[.!?]+(?=\s|$)")
+SENTENCE_END_CHARS = '.!?'
+
+VOWEL_GROUPS = re.compile(r'[aeiouyàáâäèéêëìíîïòóôöùúûü]+')
+SILENT_ENDING = re.compile(r'(?:[^laeiouysxzcg]es|[^laeiouytd]ed|[^laeiouy]e)$')
+
+COMPLEX_WORD_SYLLABLES = 3  # Gunning Fog "complex" and SMOG "polysyllable" words
+
+
+@lru_cache(maxsize=Config.SYLLABLE_CACHE_SIZE)
+def count_syllables(word):
+    """Estimate the syllables in a lowercase English word from its vowel groups"""
+    if len(word) <= 3:
+        return 1
+    word = SILENT_ENDING.sub('', word.replace('’', "'"))
+    if word.startswith('y'):
+        word = word[1:]
+    return max(1, len(VOWEL_GROUPS.findall(word)))
+
+
+def text_statistics(text):
+    """
+    Word, sentence and syllable totals of a text from one tokenizing pass
+    Tokens are counted first, so syllables are only estimated once per
+    distinct word
+    """
+    counts = Counter(TOKEN_PATTERN.findall(text.lower()))
+
+    words = sentences = syllables = complex_words = 0
+    for token, count in counts.items():
+        if token[0] in SENTENCE_END_CHARS:
+            sentences += count
+            continue
+        token_syllables = count_syllables(token)
+        words += count
+        syllables += token_syllables * count
+        if token_syllables >= COMPLEX_WORD_SYLLABLES:
+            complex_words += count
+
+    # Trailing text without final punctuation is still a sentence
+    if words and not text.rstrip().endswith(tuple(SENTENCE_END_CHARS)):
+        sentences += 1
+
+    return {
+        'words': words,
+        'sentences': max(sentences, 1) if words else 0,
+        'syllables': syllables,
+        'complex_words': complex_words
+    }
+
+
+def readability_metrics(text):
+    """Flesch Reading Ease, Flesch-Kincaid grade, Gunning Fog and SMOG for a text"""
+    stats = text_statistics(text)
+    words, sentences = stats['words'], stats['sentences']
+    if not words:
+        return None
+
+    words_per_sentence = words / sentences
+    syllables_per_word = stats['syllables'] / words
+
+    return {
+        'flesch_reading_ease': round(206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word, 1),
+        'flesch_kincaid_grade': round(0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59, 1),
+        'gunning_fog': round(0.4 * (words_per_sentence + 100 * stats['complex_words'] / words), 1),
+        'smog_index': round(1.0430 * math.sqrt(stats['complex_words'] * 30 / sentences) + 3.1291, 1),
+        'sentence_count': sentences,
+        'avg_words_per_sentence': round(words_per_sentence, 1),
+        'avg_syllables_per_word': round(syllables_per_word, 2)
+    }
@@ -0,0 +1,141 @@
+import gzip
+import io
+import os
+from collections import deque
+from contextlib import ExitStack
+from datetime import date, datetime, timezone
+from lxml import etree
+from backend.utils.http_client import http_get
+from backend.utils.helpers import normalize_url, is_valid_url
+from config import Config
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Sitemap entries in any namespace (the spec uses sitemaps.org/schemas/sitemap/0.9)
+URL_TAG = '{*}url'
+SITEMAP_TAG = '{*}sitemap'
+
+
+def parse_lastmod(value):
+    """Parse a W3C datetime (a date or a full timestamp) as an aware UTC datetime"""
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, date):
+        parsed = datetime(value.year, value.month, value.day)
+    else:
+        value = (value or '').strip()
+        if not value:
+            return None
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def open_sitemap(source, stack):
+    """
+    Open a sitemap URL (or, for the command line, a local file) as a binary stream
+    Gzipped sitemaps are decompressed on the fly, whatever their name.
+    Every layer (file or HTTP response, buffer, gzip reader) is registered
+    on the ExitStack `stack`, so closing it releases the connection too
+    """
+    if os.path.isfile(source):
+        stream = stack.enter_context(open(source, 'rb'))
+    else:
+        response = stack.enter_context(http_get(source, timeout=Config.TIMEOUT_SECONDS, stream=True))
+        response.raise_for_status()
+        # Undo any Content-Encoding while reading, and stay readable at EOF
+        # so the buffered reader below sees a clean end of stream
+        response.raw.decode_content = True
+        response.raw.auto_close = False
+        stream = response.raw
+
+    stream = stack.enter_context(io.BufferedReader(stream))
+    if stream.peek(len(GZIP_MAGIC))[:len(GZIP_MAGIC)] == GZIP_MAGIC:
+        # GzipFile never closes the stream it reads from
+        return stack.enter_context(gzip.GzipFile(fileobj=stream))
+    return stream
+
+
+def iter_sitemap_entries(stream):
+    """
+    Yield (kind, loc, lastmod) for every <url> and <sitemap> entry in a stream
+    Elements are freed as soon as they are read, so memory use does not grow
+    with the size of the sitemap
+    """
+    context = etree.iterparse(
+        stream,
+        events=('end',),
+        tag=(URL_TAG, SITEMAP_TAG),
+        resolve_entities=False,
+        no_network=True
+    )
+    for _, element in context:
+        kind = 'sitemap' if etree.QName(element).localname == 'sitemap' else 'url'
+        loc = element.findtext('{*}loc')
+        lastmod = element.findtext('{*}lastmod')
+
+        # Drop the element and the already-processed siblings before it
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+        if loc and loc.strip():
+            yield kind, loc.strip(), lastmod
+
+
+def iter_sitemap_urls(source, since=None, max_sitemaps=None):
+    """
+    Lazily yield the page URLs listed in a sitemap or sitemap index
+    Child sitemaps are read one at a time as the caller consumes URLs.
+    With since, entries (and whole child sitemaps) whose <lastmod> is older
+    are skipped; entries without a <lastmod> are always kept.
+    """
+    since = parse_lastmod(since) if since else None
+    max_sitemaps = max_sitemaps or Config.SITEMAP_MAX_SITEMAPS
+
+    pending = deque([source])
+    seen = {source}
+    opened = 0
+
+    while pending and opened < max_sitemaps:
+        sitemap = pending.popleft()
+        opened += 1
+
+        stack = ExitStack()
+        try:
+            stream = open_sitemap(sitemap, stack)
+        except Exception as e:
+            stack.close()
+            if sitemap is source:
+                raise Exception(f"Failed to fetch sitemap: {str(e)}")
+            print(f"Skipping sitemap {sitemap}: {str(e)}")
+            continue
+
+        try:
+            for kind, loc, lastmod in iter_sitemap_entries(stream):
+                if since and lastmod:
+                    modified = parse_lastmod(lastmod)
+                    if modified and modified < since:
+                        continue
+
+                if kind == 'sitemap':
+                    # Child sitemaps are always fetched, never opened from disk
+                    if loc.startswith(('http://', 'https://')) and loc not in seen:
+                        seen.add(loc)
+                        pending.append(loc)
+                    continue
+
+                url = normalize_url(loc)
+                if is_valid_url(url):
+                    yield url
+        except etree.XMLSyntaxError as e:
+            if sitemap is source:
+                raise Exception(f"Invalid sitemap XML: {str(e)}")
+            print(f"Skipping invalid sitemap {sitemap}: {str(e)}")
+        finally:
+            stack.close()
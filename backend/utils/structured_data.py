@@ -0,0 +1,317 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from config import Config
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:  # orjson is optional; the standard parser gives the same results
+    json_loads = json.loads
+
+LOCAL_BUSINESS_TYPES = {
+    'LocalBusiness', 'AnimalShelter', 'AutomotiveBusiness', 'AutoRepair', 'Bakery', 'BarOrPub',
+    'BeautySalon', 'CafeOrCoffeeShop', 'ChildCare', 'Dentist', 'DryCleaningOrLaundry',
+    'Electrician', 'EmergencyService', 'EmploymentAgency', 'EntertainmentBusiness',
+    'FinancialService', 'FoodEstablishment', 'GeneralContractor', 'GovernmentOffice',
+    'HairSalon', 'HealthAndBeautyBusiness', 'HomeAndConstructionBusiness', 'Hotel',
+    'HousePainter', 'HVACBusiness', 'LegalService', 'Library', 'Locksmith',
+    'LodgingBusiness', 'MedicalBusiness', 'MedicalClinic', 'MovingCompany', 'Optician',
+    'Pharmacy', 'Physician', 'Plumber', 'ProfessionalService', 'RealEstateAgent',
+    'Restaurant', 'RoofingContractor', 'SelfStorage', 'ShoppingCenter',
+    'SportsActivityLocation', 'Store', 'TravelAgency', 'VeterinaryCare'
+}
+ORGANIZATION_TYPES = {
+    'Organization', 'Corporation', 'EducationalOrganization', 'GovernmentOrganization',
+    'NewsMediaOrganization', 'NGO', 'OnlineBusiness', 'OnlineStore'
+}
+PRODUCT_TYPES = {'Product', 'ProductGroup', 'ProductModel', 'IndividualProduct'}
+ARTICLE_TYPES = {
+    'Article', 'NewsArticle', 'BlogPosting', 'TechArticle', 'ScholarlyArticle',
+    'Report', 'LiveBlogPosting', 'SocialMediaPosting', 'OpinionNewsArticle'
+}
+BREADCRUMB_TYPES = {'BreadcrumbList'}
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def short_type(value):
+    """'https://schema.org/LocalBusiness' or 'schema:LocalBusiness' -> 'LocalBusiness'"""
+    return value.rstrip('/').rsplit('/', 1)[-1].rsplit(':', 1)[-1].rsplit('#', 1)[-1]
+
+
+def node_types(node):
+    types = node.get('@type') or []
+    if isinstance(types, str):
+        types = [types]
+    return [short_type(t) for t in types if isinstance(t, str)]
+
+
+def entity_kind(types):
+    """The entity family of a node's types, or None for types we do not report"""
+    for kind, family in (
+        ('LocalBusiness', LOCAL_BUSINESS_TYPES),
+        ('Product', PRODUCT_TYPES),
+        ('Article', ARTICLE_TYPES),
+        ('BreadcrumbList', BREADCRUMB_TYPES),
+        ('Organization', ORGANIZATION_TYPES)
+    ):
+        if any(t in family for t in types):
+            return kind
+    # Unlisted schema.org subtypes such as ShoeStore or SportsBusiness
+    if any(t.endswith(('Store', 'Business')) for t in types):
+        return 'LocalBusiness'
+    return None
+
+
+def parse_json_ld(raw):
+    """Parse one JSON-LD script body; None when it is not valid JSON"""
+    raw = raw.strip()
+    # Old pages hide the JSON from legacy browsers in comments or CDATA
+    for opening, closing in (('<!--', '-->'), ('//<![CDATA[', '//]]>'), ('<![CDATA[', ']]>')):
+        if raw.startswith(opening) and raw.endswith(closing):
+            raw = raw[len(opening):-len(closing)].strip()
+    try:
+        return json_loads(raw)
+    except ValueError:
+        return None
+
+
+def iter_typed_nodes(data):
+    """Every object with an @type in parsed JSON-LD, including @graph members and nested values"""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            if '@type' in value:
+                yield value
+            stack.extend(reversed([v for v in value.values() if isinstance(v, (dict, list))]))
+        elif isinstance(value, list):
+            stack.extend(reversed(value))
+
+
+def first(value):
+    """First of a repeated value"""
+    if isinstance(value, list):
+        return first(value[0]) if value else None
+    return value
+
+
+def as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def text_value(value):
+    """A plain string for a property that may be text, a number or a nested object"""
+    value = first(value)
+    if isinstance(value, dict):
+        value = value.get('name') or value.get('@id') or value.get('url') or value.get('@value')
+        value = first(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return value.strip() or None
+    return None
+
+
+def extract_address(value):
+    value = first(value)
+    if isinstance(value, dict):
+        address = {
+            'street': text_value(value.get('streetAddress')),
+            'locality': text_value(value.get('addressLocality')),
+            'region': text_value(value.get('addressRegion')),
+            'postal_code': text_value(value.get('postalCode')),
+            'country': text_value(value.get('addressCountry'))
+        }
+        return {key: part for key, part in address.items() if part is not None} or None
+    return text_value(value)
+
+
+def extract_geo(value):
+    value = first(value)
+    if not isinstance(value, dict):
+        return None
+    latitude, longitude = text_value(value.get('latitude')), text_value(value.get('longitude'))
+    if latitude is None or longitude is None:
+        return None
+    return {'latitude': latitude, 'longitude': longitude}
+
+
+def extract_opening_hours(node):
+    """Opening hours as strings, from openingHours text or openingHoursSpecification objects"""
+    hours = [text_value(value) for value in as_list(node.get('openingHours'))]
+    for spec in as_list(node.get('openingHoursSpecification')):
+        if not isinstance(spec, dict):
+            continue
+        days = ','.join(short_type(day) for day in as_list(spec.get('dayOfWeek')) if isinstance(day, str))
+        opens, closes = text_value(spec.get('opens')), text_value(spec.get('closes'))
+        hours.append(' '.join(part for part in (days, f'{opens}-{closes}' if opens or closes else '') if part))
+    return [hour for hour in hours if hour]
+
+
+def extract_local_business(node):
+    return {
+        'name': text_value(node.get('name')),
+        'telephone': text_value(node.get('telephone')),
+        'email': text_value(node.get('email')),
+        'address': extract_address(node.get('address')),
+        'geo': extract_geo(node.get('geo')),
+        'opening_hours': extract_opening_hours(node),
+        'url': text_value(node.get('url'))
+    }
+
+
+def extract_organization(node):
+    return {
+        'name': text_value(node.get('name')),
+        'url': text_value(node.get('url')),
+        'logo': text_value(node.get('logo')),
+        'telephone': text_value(node.get('telephone')),
+        'address': extract_address(node.get('address')),
+        'same_as': [text_value(link) for link in as_list(node.get('sameAs')) if text_value(link)]
+    }
+
+
+def extract_product(node):
+    offer = first(node.get('offers'))
+    offer = offer if isinstance(offer, dict) else {}
+    rating = first(node.get('aggregateRating'))
+    rating = rating if isinstance(rating, dict) else {}
+    availability = text_value(offer.get('availability'))
+    return {
+        'name': text_value(node.get('name')),
+        'sku': text_value(node.get('sku')),
+        'brand': text_value(node.get('brand')),
+        'price': text_value(offer.get('price') or offer.get('lowPrice')),
+        'currency': text_value(offer.get('priceCurrency')),
+        'availability': short_type(availability) if isinstance(availability, str) else None,
+        'rating': text_value(rating.get('ratingValue')),
+        'review_count': text_value(rating.get('reviewCount') or rating.get('ratingCount'))
+    }
+
+
+def extract_article(node):
+    return {
+        'headline': text_value(node.get('headline') or node.get('name')),
+        'authors': [text_value(author) for author in as_list(node.get('author')) if text_value(author)],
+        'date_published': text_value(node.get('datePublished')),
+        'date_modified': text_value(node.get('dateModified')),
+        'publisher': text_value(node.get('publisher')),
+        'image': text_value(node.get('image'))
+    }
+
+
+def extract_breadcrumbs(node):
+    items = []
+    for element in as_list(node.get('itemListElement')):
+        if not isinstance(element, dict):
+            continue
+        target = first(element.get('item'))
+        name = text_value(element.get('name')) or (text_value(target) if isinstance(target, dict) else None)
+        url = (target.get('@id') or target.get('url')) if isinstance(target, dict) else target
+        position = text_value(element.get('position'))
+        items.append({'position': position, 'name': name, 'url': text_value(url)})
+    items.sort(key=breadcrumb_position)
+    return {'items': items}
+
+
+def breadcrumb_position(item):
+    try:
+        return float(item['position'])
+    except (TypeError, ValueError):
+        return float('inf')
+
+
+ENTITY_EXTRACTORS = {
+    'LocalBusiness': extract_local_business,
+    'Organization': extract_organization,
+    'Product': extract_product,
+    'Article': extract_article,
+    'BreadcrumbList': extract_breadcrumbs
+}
+
+
+def extract_entities(nodes, source):
+    """Typed entities and the set of all types found among structured-data nodes"""
+    entities = []
+    types = set()
+    for node in nodes:
+        node_type_list = node_types(node)
+        types.update(node_type_list)
+        kind = entity_kind(node_type_list)
+        if kind is None:
+            continue
+        entity = {'kind': kind, 'type': node_type_list[0] if node_type_list else kind, 'source': source}
+        entity.update(ENTITY_EXTRACTORS[kind](node))
+        entities.append(entity)
+    return entities, types
+
+
+def iter_item_nodes(items):
+    """Every microdata/RDFa item, including items nested as property values"""
+    for item in items:
+        yield from iter_typed_nodes(item)
+
+
+def _extract_json_ld(blocks):
+    nodes = []
+    invalid = 0
+    for raw in blocks:
+        data = parse_json_ld(raw)
+        if data is None:
+            invalid += 1
+            continue
+        nodes.extend(iter_typed_nodes(data))
+    entities, types = extract_entities(nodes, 'json-ld')
+    return {'entities': entities, 'types': types, 'invalid': invalid}
+
+
+def _cached_json_ld(blocks):
+    """JSON-LD results keyed by a hash of the script bodies, so unchanged pages skip parsing"""
+    digest = hashlib.blake2b(digest_size=16)
+    for raw in blocks:
+        digest.update(raw.encode('utf-8', 'surrogatepass'))
+        digest.update(b'\x00')
+    key = digest.digest()
+
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+            return result
+
+    result = _extract_json_ld(blocks)
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > Config.STRUCTURED_DATA_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+
+def extract_structured_data(index):
+    """
+    Structured data of an indexed page from JSON-LD, microdata and RDFa
+    Returns the typed entities (LocalBusiness, Organization, Product,
+    Article, BreadcrumbList), every schema type seen and per-format counts
+    """
+    blocks = [raw for raw in index.json_ld if raw and raw.strip()]
+    json_ld = _cached_json_ld(blocks) if blocks else {'entities': [], 'types': set(), 'invalid': 0}
+
+    microdata_entities, microdata_types = extract_entities(iter_item_nodes(index.microdata), 'microdata')
+    rdfa_entities, rdfa_types = extract_entities(iter_item_nodes(index.rdfa), 'rdfa')
+
+    return {
+        'entities': json_ld['entities'] + microdata_entities + rdfa_entities,
+        'types': sorted(json_ld['types'] | microdata_types | rdfa_types),
+        'formats': {
+            'json_ld': len(blocks) - json_ld['invalid'],
+            'microdata': len(index.microdata),
+            'rdfa': len(index.rdfa)
+        },
+        'invalid_json_ld': json_ld['invalid']
+    }
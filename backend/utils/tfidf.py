@@ -0,0 +1,112 @@
+import array
+import numpy as np
+from backend.utils.keywords import analyze_keywords, top_counts
+from config import Config
+
+
+def term_counts(text, language=None, max_terms=None):
+    """The most frequent keyword terms of a text as a {term: count} dict"""
+    max_terms = max_terms or Config.TFIDF_MAX_TERMS_PER_DOC
+    extracted = analyze_keywords(text, top_n=max_terms, top_phrases=0, language=language)
+    return dict(extracted['keywords'])
+
+
+class TfidfCorpus:
+    """
+    Incremental term-document matrix for ranking distinctive keywords
+    Documents are appended to compressed sparse row arrays (indptr, term
+    columns and counts), keeping only each page's max_terms_per_doc most
+    frequent terms so memory grows linearly and predictably with the page
+    count. TF-IDF weights are computed over the whole matrix at once with
+    NumPy whenever they are asked for, so pages can keep being added.
+    """
+
+    def __init__(self, max_terms_per_doc=None):
+        self.max_terms_per_doc = max_terms_per_doc or Config.TFIDF_MAX_TERMS_PER_DOC
+        self.vocabulary = {}  # term -> column
+        self.terms = []  # column -> term
+        self.doc_ids = []
+
+        self._indptr = array.array('q', [0])
+        self._indices = array.array('i')
+        self._counts = array.array('I')
+        self._doc_freq = array.array('I')
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def add(self, doc_id, text, language=None):
+        """Tokenize a page's text and add it to the corpus"""
+        self.add_counts(doc_id, term_counts(text, language, self.max_terms_per_doc))
+
+    def add_counts(self, doc_id, counts):
+        """Add a document from a {term: count} mapping"""
+        if len(counts) > self.max_terms_per_doc:
+            counts = dict(top_counts(counts, self.max_terms_per_doc))
+
+        for term, count in counts.items():
+            column = self.vocabulary.get(term)
+            if column is None:
+                column = len(self.terms)
+                self.vocabulary[term] = column
+                self.terms.append(term)
+                self._doc_freq.append(0)
+            self._doc_freq[column] += 1
+            self._indices.append(column)
+            self._counts.append(count)
+
+        self._indptr.append(len(self._indices))
+        self.doc_ids.append(doc_id)
+
+    def idf(self):
+        """
+        Inverse document frequency of every term, ln((1 + N) / (1 + df))
+        Terms found on every page get 0, so site-wide boilerplate never ranks
+        """
+        doc_freq = np.frombuffer(self._doc_freq, dtype=np.uintc)
+        return np.log((1.0 + len(self.doc_ids)) / (1.0 + doc_freq)).astype(np.float32)
+
+    def weights(self, start=0, stop=None, idf=None):
+        """
+        TF-IDF weights of documents start..stop as (rows, columns, weights) arrays
+        Each row is L2-normalized so pages of any length compare
+        """
+        stop = len(self.doc_ids) if stop is None else stop
+        idf = self.idf() if idf is None else idf
+
+        indptr = np.frombuffer(self._indptr, dtype=np.int64)[start:stop + 1]
+        low, high = int(indptr[0]), int(indptr[-1])
+        columns = np.frombuffer(self._indices, dtype=np.intc)[low:high].copy()
+        counts = np.frombuffer(self._counts, dtype=np.uintc)[low:high]
+
+        rows = np.repeat(np.arange(start, stop, dtype=np.intc), np.diff(indptr))
+        weights = counts * idf[columns]
+
+        norms = np.sqrt(np.bincount(rows - start, weights=weights * weights, minlength=stop - start))
+        norms[norms == 0] = 1.0
+        weights /= norms[rows - start].astype(np.float32)
+        return rows, columns, weights
+
+    def top_terms(self, n=10, block_size=10000):
+        """
+        Map each document to its n most distinctive (term, weight) pairs
+        Rows are weighted and ranked a block at a time, so the working
+        memory stays the same however large the corpus grows
+        """
+        idf = self.idf()
+        indptr = np.frombuffer(self._indptr, dtype=np.int64)
+        top = {doc_id: [] for doc_id in self.doc_ids}
+
+        for start in range(0, len(self.doc_ids), block_size):
+            stop = min(start + block_size, len(self.doc_ids))
+            rows, columns, weights = self.weights(start, stop, idf)
+
+            # Sort entries by weight within each row; rows are already grouped
+            order = np.lexsort((-weights, rows))
+            ranks = np.arange(len(order)) - (indptr[rows] - indptr[start])
+            selected = order[(ranks < n) & (weights[order] > 0)]
+
+            for row, column, weight in zip(rows[selected].tolist(), columns[selected].tolist(),
+                                           np.round(weights[selected].astype(np.float64), 4).tolist()):
+                top[self.doc_ids[row]].append((self.terms[column], weight))
+        return top
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Bulk SEO analysis from the command line
+Reads URLs from a file, stdin or a sitemap (or pages from local HTML files
+and WARC archives) and analyzes them across a pool of processes, writing one
+result per URL to JSONL or CSV. Interrupted runs resume from a checkpoint file.
+
+Examples:
+    python bulk_analyze.py urls.txt -o results.jsonl
+    cat urls.txt | python bulk_analyze.py - -o results.csv --workers 8
+    python bulk_analyze.py --sitemap https://example.com/sitemap.xml -o results.jsonl
+    python bulk_analyze.py --offline crawl.warc.gz -o rescored.jsonl
+    python bulk_analyze.py urls.txt -o results.jsonl --duplicates duplicates.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from backend.analyzers.batch_analyzer import analyze_one
+from backend.utils.duplicates import DuplicateIndex
+from backend.utils.helpers import normalize_url
+from backend.utils.offline import iter_offline_pages
+from backend.utils.sitemap import iter_sitemap_urls
+
+CSV_FIELDS = [
+    'url', 'success', 'overall_score', 'metadata_score', 'links_score',
+    'content_score', 'performance_score', 'status_code', 'response_time',
+    'issue_count', 'simhash', 'error'
+]
+
+PROGRESS_INTERVAL = 5  # Seconds between progress lines
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Analyze many URLs for SEO in parallel')
+    parser.add_argument('input', nargs='?', default='-',
+                        help="File with one URL per line, or '-' for stdin (default)")
+    parser.add_argument('--sitemap', help='Read URLs from a sitemap or sitemap index (URL or local file) instead')
+    parser.add_argument('--since', help='With --sitemap, only URLs whose <lastmod> is on or after this date')
+    parser.add_argument('--offline',
+                        help='Analyze local HTML files or WARC/WARC.gz archives (a file or directory) without fetching')
+    parser.add_argument('--base-url', help='With --offline, URL that HTML file paths are resolved against')
+    parser.add_argument('-o', '--output', required=True, help='Output file (.jsonl or .csv)')
+    parser.add_argument('--format', choices=['jsonl', 'csv'],
+                        help='Output format (default: from the output file extension)')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes (default: number of CPUs)')
+    parser.add_argument('--checkpoint',
+                        help='Checkpoint file of finished URLs (default: <output>.checkpoint)')
+    parser.add_argument('--performance', action='store_true', help='Include PageSpeed metrics')
+    parser.add_argument('--geo', action='store_true', help='Include GEO analysis')
+    parser.add_argument('--check-links', action='store_true', help='Check every link for broken targets')
+    parser.add_argument('--duplicates',
+                        help='Write clusters of near-duplicate pages to this JSON file when the run finishes')
+    args = parser.parse_args(argv)
+
+    if args.format is None:
+        args.format = 'csv' if args.output.lower().endswith('.csv') else 'jsonl'
+    if args.checkpoint is None:
+        args.checkpoint = args.output + '.checkpoint'
+    return args
+
+
+def iter_inputs(args, finished):
+    """
+    (url, page) pairs from the chosen source, read lazily and skipping finished URLs
+    page is the pre-read PageResponse for offline input, otherwise None
+    """
+    if args.offline:
+        for page in iter_offline_pages(args.offline, base_url=args.base_url, exclude=finished):
+            yield page.url, page
+        return
+
+    if args.sitemap:
+        urls = iter_sitemap_urls(args.sitemap, since=args.since)
+    else:
+        urls = iter_file_urls(args.input)
+
+    for url in urls:
+        if url not in finished:
+            yield url, None
+
+
+def iter_file_urls(path):
+    """Normalized URLs from a file with one URL per line, or stdin"""
+    stream = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    try:
+        for line in stream:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield normalize_url(line)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def count_input_urls(args):
+    """Number of URLs in an input file, or None when it cannot be known up front"""
+    if args.offline or args.sitemap or args.input == '-':
+        return None
+    with open(args.input, encoding='utf-8') as f:
+        return sum(1 for line in f if line.strip() and not line.strip().startswith('#'))
+
+
+def load_checkpoint(path):
+    """URLs already finished by an earlier run"""
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding='utf-8') as f:
+        return set(line.strip() for line in f if line.strip())
+
+
+def csv_row(result):
+    scores = result.get('scores') or {}
+    return {
+        'url': result.get('url'),
+        'success': result.get('success'),
+        'overall_score': result.get('overall_score'),
+        'metadata_score': scores.get('metadata'),
+        'links_score': scores.get('links'),
+        'content_score': scores.get('content'),
+        'performance_score': scores.get('performance'),
+        'status_code': result.get('status_code'),
+        'response_time': result.get('response_time'),
+        'issue_count': len(result.get('issues', [])),
+        'simhash': (result.get('content') or {}).get('simhash'),
+        'error': result.get('error')
+    }
+
+
+def read_fingerprints(output, output_format):
+    """(url, simhash) pairs already written to an output file by an earlier run"""
+    if not os.path.exists(output):
+        return
+    with open(output, encoding='utf-8', newline='') as f:
+        if output_format == 'csv':
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            fingerprint = row.get('simhash') or (row.get('content') or {}).get('simhash')
+            if fingerprint:
+                yield row['url'], fingerprint
+
+
+def write_duplicates(path, index):
+    clusters = index.clusters()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'pages_fingerprinted': len(index), 'clusters': clusters}, f, indent=2)
+    print(f"{len(clusters)} near-duplicate clusters written to {path}", file=sys.stderr)
+
+
+class ResultWriter:
+    """Appends results to the output file and records them in the checkpoint"""
+
+    def __init__(self, output, output_format, checkpoint):
+        is_new = not os.path.exists(output) or os.path.getsize(output) == 0
+        self.output = open(output, 'a', encoding='utf-8', newline='')
+        self.checkpoint = open(checkpoint, 'a', encoding='utf-8')
+        self.csv_writer = None
+
+        if output_format == 'csv':
+            self.csv_writer = csv.DictWriter(self.output, fieldnames=CSV_FIELDS)
+            if is_new:
+                self.csv_writer.writeheader()
+
+    def write(self, url, result):
+        if self.csv_writer:
+            self.csv_writer.writerow(csv_row(result))
+        else:
+            self.output.write(json.dumps(result) + '\n')
+        self.output.flush()
+
+        # Only checkpoint once the result is safely in the output
+        self.checkpoint.write(url + '\n')
+        self.checkpoint.flush()
+
+    def close(self):
+        self.output.close()
+        self.checkpoint.close()
+
+
+class Progress:
+    """Throughput and ETA, printed to stderr"""
+
+    def __init__(self, total=None, skipped=0):
+        self.total = total
+        self.skipped = skipped
+        self.done = 0
+        self.failed = 0
+        self.started = time.time()
+        self.last_report = self.started
+
+    def update(self, success):
+        self.done += 1
+        if not success:
+            self.failed += 1
+        if time.time() - self.last_report >= PROGRESS_INTERVAL:
+            self.report()
+
+    def report(self):
+        now = time.time()
+        self.last_report = now
+        elapsed = now - self.started
+        rate = self.done / elapsed if elapsed else 0
+
+        line = f"{self.done} analyzed ({self.failed} failed), {rate:.1f} URLs/s"
+        if self.total is not None:
+            remaining = max(self.total - self.skipped - self.done, 0)
+            eta = remaining / rate if rate else 0
+            line = f"{self.skipped + self.done}/{self.total} | " + line + f", ETA {format_duration(eta)}"
+        print(line, file=sys.stderr, flush=True)
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{seconds:02d}s" if hours else f"{minutes}m{seconds:02d}s"
+
+
+def _init_worker():
+    # Ctrl+C is handled by the parent, which stops handing out work
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def run(args):
+    finished = load_checkpoint(args.checkpoint)
+    if finished:
+        print(f"Resuming: {len(finished)} URLs already done", file=sys.stderr)
+
+    options = {
+        'include_performance': args.performance,
+        'include_geo': args.geo,
+        'check_links': args.check_links
+    }
+    inputs = iter_inputs(args, finished)
+    progress = Progress(total=count_input_urls(args), skipped=len(finished))
+    writer = ResultWriter(args.output, args.format, args.checkpoint)
+
+    duplicates = None
+    if args.duplicates:
+        duplicates = DuplicateIndex()
+        for url, fingerprint in read_fingerprints(args.output, args.format):
+            duplicates.add_fingerprint(url, int(fingerprint, 16))
+
+    # Keep a bounded number of URLs in flight so memory stays flat
+    max_in_flight = args.workers * 2
+    pending = {}
+
+    executor = ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker)
+    try:
+        while True:
+            for url, page in inputs:
+                pending[executor.submit(analyze_one, url, page=page, **options)] = url
+                if len(pending) >= max_in_flight:
+                    break
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker process itself failed
+                    result = {'success': False, 'url': url, 'error': str(e)}
+                writer.write(url, result)
+                progress.update(result.get('success'))
+
+                fingerprint = (result.get('content') or {}).get('simhash')
+                if duplicates is not None and fingerprint:
+                    duplicates.add_fingerprint(url, int(fingerprint, 16))
+
+        executor.shutdown()
+    except KeyboardInterrupt:
+        print("\nInterrupted; run the same command again to resume", file=sys.stderr)
+        executor.shutdown(wait=False, cancel_futures=True)
+        return 130
+    finally:
+        writer.close()
+
+    progress.report()
+    if duplicates is not None:
+        write_duplicates(args.duplicates, duplicates)
+    return 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        return run(args)
+    except Exception as e:
+        print(f"❌ {str(e)}", file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,15 +8,82 @@ class Config:
     # API Configuration
     LIGHTHOUSE_API_KEY = os.environ.get('LIGHTHOUSE_API_KEY', '')
     PAGESPEED_API_URL = 'https://www.googleapis.com/pagespeedonline/v5/runPagespeed'
+    PAGESPEED_CACHE_DIR = os.environ.get('PAGESPEED_CACHE_DIR', os.path.join('.cache', 'pagespeed'))
+    PAGESPEED_CACHE_TTL = int(os.environ.get('PAGESPEED_CACHE_TTL', 24 * 60 * 60))  # 1 day
+    PAGESPEED_RATE_PER_MINUTE = float(os.environ.get('PAGESPEED_RATE_PER_MINUTE', 60))
+    PAGESPEED_BURST = int(os.environ.get('PAGESPEED_BURST', 5))
+    PAGESPEED_QUEUE_TIMEOUT = 10  # Seconds a call may wait for the rate limiter
+    
+    # HTTP client settings
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', 20))  # Hosts kept in the pool
+    HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 10))  # Connections per host
+    HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 2))
+    HTTP_BACKOFF_FACTOR = float(os.environ.get('HTTP_BACKOFF_FACTOR', 0.5))
     
     # Cache configuration
-    CACHE_TYPE = 'simple'
-    CACHE_DEFAULT_TIMEOUT = 300
+    CACHE_TYPE = os.environ.get('CACHE_TYPE', 'simple')  # 'simple' (in-memory) or 'null' (disabled)
+    CACHE_DEFAULT_TIMEOUT = 300  # Seconds before a cached page is revalidated
+    CACHE_MAX_BYTES = 64 * 1024 * 1024  # 64MB of page bodies per worker
     
     # Analysis settings
     MAX_URLS_PER_REQUEST = 2
     TIMEOUT_SECONDS = 30
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
+    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB, longer pages are truncated
+    FETCH_CHUNK_SIZE = 64 * 1024
+    ALLOWED_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+    HTML_PARSER_BACKEND = os.environ.get('HTML_PARSER_BACKEND', 'beautifulsoup')  # or 'lxml'
+    COMPARE_MAX_WORKERS = 2  # Both sides of /api/compare run in parallel
+    PERFORMANCE_MAX_WORKERS = 4  # Concurrent background PageSpeed requests
+    
+    # Broken link checking
+    LINK_CHECK_ENABLED = os.environ.get('LINK_CHECK_ENABLED', 'true').lower() == 'true'
+    LINK_CHECK_MAX_WORKERS = 32
+    LINK_CHECK_PER_HOST_LIMIT = 4  # Concurrent checks against any one host
+    LINK_CHECK_TIMEOUT = 5  # Seconds per link
+    LINK_CHECK_TIME_BUDGET = 10  # Seconds for all links on a page
+    LINK_CHECK_CACHE_TTL = 60 * 60
+    LINK_CHECK_CACHE_SIZE = 50000
+    
+    # Site crawl settings
+    CRAWL_MAX_PAGES = 500  # Upper bound for a synchronous /api/crawl
+    CRAWL_JOB_MAX_PAGES = int(os.environ.get('CRAWL_JOB_MAX_PAGES', 50000))  # Upper bound for an async crawl job
+    CRAWL_MAX_DEPTH = 3
+    CRAWL_CONCURRENCY = 8
+    CRAWL_PER_HOST_LIMIT = 4  # Concurrent requests to any one host
+    TFIDF_MAX_TERMS_PER_DOC = 100  # Most frequent terms kept per page for site-wide keywords
+    DISTINCTIVE_KEYWORDS = 10  # Distinctive keywords reported per crawled page
+    
+    # Duplicate content settings
+    DUPLICATE_MAX_DISTANCE = 3  # Differing SimHash bits (of 64) still counted as near-duplicates
+    DUPLICATE_MIN_WORDS = 20  # Pages with less text are not fingerprinted
+    SYLLABLE_CACHE_SIZE = 100000  # Distinct words whose syllable counts are memoized for readability
+    STRUCTURED_DATA_CACHE_SIZE = 10000  # Parsed JSON-LD results kept by content hash
+    
+    # Batch analysis settings
+    BATCH_MAX_URLS = 10000  # Upper bound for /api/batch
+    BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', 8))
+    SITEMAP_MAX_SITEMAPS = 1000  # Child sitemaps read from one sitemap index
+    
+    # Response settings
+    COMPRESS_MIN_SIZE = 1024  # Bytes; smaller responses are sent uncompressed
+    COMPRESS_GZIP_LEVEL = 6
+    COMPRESS_BROTLI_QUALITY = 5  # Brotli's default of 11 is too slow for per-request use
+    
+    # Analysis history settings
+    HISTORY_ENABLED = os.environ.get('HISTORY_ENABLED', 'true').lower() == 'true'
+    HISTORY_DB_PATH = os.environ.get('HISTORY_DB_PATH', os.path.join('data', 'history.db'))
+    HISTORY_BATCH_SIZE = 500  # Results written per transaction
+    HISTORY_QUEUE_SIZE = 10000  # Results waiting to be written before new ones are dropped
+    HISTORY_BUSY_TIMEOUT = 10  # Seconds to wait for another worker's write lock
+    HISTORY_FLUSH_TIMEOUT = 10  # Seconds allowed at exit to write queued results
+    HISTORY_MAX_LIMIT = 1000  # Upper bound for rows returned by the history endpoints
+    
+    # Background job settings
+    JOB_MAX_WORKERS = int(os.environ.get('JOB_MAX_WORKERS', 4))
+    JOB_QUEUE_SIZE = 100  # Jobs waiting for a worker before submissions are refused
+    JOB_TTL = int(os.environ.get('JOB_TTL', 60 * 60))  # Seconds a finished job stays available
+    JOB_MAX_STORED = 1000
     
     # SEO Score Weights
     METADATA_WEIGHT = 0.20
@@ -143,6 +143,60 @@ def check_config():
         print(f"❌ Configuration - Error: {str(e)}")
         return False
 
+PARITY_SAMPLE_HTML = """<!DOCTYPE html>
+<html lang="en"><head><title>Parser parity sample page for the analyzers</title>
+<meta name="description" content="Sample page used to check that every parser backend produces the same analysis">
+<meta property="og:title" content="Parity sample">
+<script type="application/ld+json">{"@type": "LocalBusiness", "telephone": "555-123-4567"}</script>
+<style>p { color: red; }</style></head>
+<body><header><nav><a href="/">Home</a> <a href="/about">About</a></nav></header>
+<h1>Parity <a href="/h1-link">check</a><!-- comment --> tail</h1><h2>Section</h2>
+<p>Local bakery near me in Springfield. Call (555) 123-4567 or write to hello@example.com.</p>
+<p>Fresh bread &amp; pastries baked daily <![CDATA[ignored]]> on 12 Main Street.</p>
+<pre>  keep   spacing  </pre><template><p>template text</p></template>
+<img src="a.png" alt="Bread"><img src="b.png">
+<a href="https://example.org/" rel="nofollow noopener">Partner</a><script>var hidden = 1;</script>
+<footer>Springfield Bakery</footer></body></html>
+"""
+
+def check_parser_parity():
+    """Check that every HTML parser backend gives identical analyzer output"""
+    print("\n🔍 Checking HTML parser backend parity...")
+    
+    try:
+        from backend.utils.parsers import PARSER_BACKENDS
+        from backend.utils.dom_index import build_document_index
+        from backend.analyzers.metadata_analyzer import MetadataAnalyzer
+        from backend.analyzers.link_analyzer import LinkAnalyzer
+        from backend.analyzers.content_analyzer import ContentAnalyzer
+        from backend.analyzers.geo_analyzer import GeoAnalyzer
+        
+        url = 'https://example.com/'
+        outputs = {}
+        for name, backend in PARSER_BACKENDS.items():
+            document = backend.parse(PARITY_SAMPLE_HTML)
+            index = build_document_index(document)
+            outputs[name] = [
+                analyzer(document, url, index=index).analyze()
+                for analyzer in (MetadataAnalyzer, LinkAnalyzer, ContentAnalyzer, GeoAnalyzer)
+            ]
+        
+        reference_name, reference = next(iter(outputs.items()))
+        all_match = True
+        for name, output in outputs.items():
+            if name == reference_name:
+                continue
+            if output == reference:
+                print(f"✅ {name} - Matches {reference_name}")
+            else:
+                print(f"❌ {name} - Differs from {reference_name}")
+                all_match = False
+        
+        return all_match
+    except Exception as e:
+        print(f"❌ Parser parity - Error: {str(e)}")
+        return False
+
 def run_all_checks():
     """Run all checks"""
     print("=" * 60)
@@ -155,7 +209,8 @@ def run_all_checks():
         'Directories': check_directories(),
         'Files': check_files(),
         'App Import': check_imports(),
-        'Configuration': check_config()
+        'Configuration': check_config(),
+        'Parser Parity': check_parser_parity()
     }
     
     print("\n" + "=" * 60)